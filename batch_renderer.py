@@ -0,0 +1,93 @@
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from chart_catalog import (TOPIC_NAMES, TOPIC_DATA_TYPES, CHART_TYPES, TOPIC_CHART_TYPES, TOPIC_KEYS, COLORS,
+                           chart_data, chart_title)
+from chart_renderer import ChartRenderer
+from data_loader import DataLoader
+
+class BatchRenderer:
+    """Renders every chart the app offers to image files on the Agg backend, without Tk"""
+
+    def __init__(self, csv_file, output_dir, formats=('png',), workers=None, cache_dir=None):
+
+        self.csv_file = csv_file
+        self.output_dir = output_dir
+        self.formats = formats
+        self.workers = workers
+        self.data_loader = DataLoader(cache_dir=cache_dir)
+
+    def chart_jobs(self, topic_data):
+        """One job per topic, data type and chart type combination offered in the UI"""
+        jobs = []
+        for topic in TOPIC_NAMES:
+            chart_types = TOPIC_CHART_TYPES.get(topic, CHART_TYPES)
+            
+
+            # The confidence chart is always a grouped bar chart, whatever chart type is selected.
+            if topic == "Confidence in Achieving Career Goals":
+                chart_types = chart_types[:1]
+                
+
+            for data_type in TOPIC_DATA_TYPES[topic]:
+                data = chart_data(topic_data, topic, data_type)
+                if not data:
+                    print(f"Skipping {topic} / {data_type}: no data available")
+                    continue
+                    
+                for chart_type in chart_types:
+                    name = f"{TOPIC_KEYS[topic]}-{data_type}-{chart_type}"
+                    jobs.append((data, chart_type, chart_title(topic, data_type), topic,
+                                 os.path.join(self.output_dir, name)))
+        return jobs
+
+    def render_all(self):
+
+        topic_data = self.data_loader.load_topics(self.data_loader.load_export(self.csv_file))
+        jobs = self.chart_jobs(topic_data)
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+
+        paths = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(render_chart, *job, self.formats) for job in jobs]
+            for future in futures:
+                paths.extend(future.result())
+        return paths
+
+
+def render_chart(chart_data, chart_type, title, topic_type, path, formats=('png',)):
+    """Process-pool entry point: draw one chart and save it in each requested format"""
+    fig = Figure(figsize=(10, 8), dpi=100)
+    FigureCanvasAgg(fig)
+    ChartRenderer(COLORS).draw_chart(fig, chart_data, chart_type, title, topic_type)
+    
+
+    paths = []
+    for fmt in formats:
+        fig.savefig(f"{path}.{fmt}", format=fmt)
+        paths.append(f"{path}.{fmt}")
+    return paths
+
+
+def parse_args():
+
+    parser = argparse.ArgumentParser(description="Render every survey chart to image files without opening the GUI")
+    parser.add_argument('csv_file', nargs='?', default="data.csv", help="Qualtrics CSV export to visualize")
+    parser.add_argument('--output-dir', default="charts", help="Directory to write the chart images to")
+    parser.add_argument('--format', dest='formats', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'],
+                        help="Image formats to write for each chart")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes to render with")
+    return parser.parse_args()
+
+def main():
+
+    args = parse_args()
+    renderer = BatchRenderer(args.csv_file, args.output_dir, args.formats, args.workers)
+    paths = renderer.render_all()
+    print(f"Rendered {len(paths)} chart files to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
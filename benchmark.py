@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import subprocess
+import warnings
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+from chart_catalog import TOPIC_DATA_TYPES, chart_data
+from data_loader import DataLoader, TOPICS
+from respondent_store import DemographicRollups
+from synthetic_export import SyntheticExport
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DATA_DIR = '.benchmark_data'
+RESULTS_FILE = os.path.join(DATA_DIR, 'benchmark_results.jsonl')
+
+# A typical interactive slice: two dimensions, one of them a year range.
+CROSS_FILTER_SELECTION = {'gender': {'Female'}, 'birthYear': range(1970, 1990)}
+
+class BenchmarkSuite:
+    """Times and memory-profiles the DataLoader and chart-data paths on synthetic exports of increasing size"""
+
+    def __init__(self, sizes=DEFAULT_SIZES, data_dir=DATA_DIR, results_file=RESULTS_FILE, version=None,
+                 repeat=3, seed=0, only=None):
+
+        self.sizes = sizes
+        self.data_dir = data_dir
+        self.results_file = results_file
+        self.version = version or self.current_version()
+        self.repeat = repeat
+        self.seed = seed
+        self.only = only
+
+    def current_version(self):
+
+        try:
+            return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                                  check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return 'unknown'
+
+    def dataset(self, rows):
+        """Path of the synthetic export with this many rows, generating it on first use"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        path = os.path.join(self.data_dir, f"synthetic-{rows}-seed{self.seed}.csv")
+        if not os.path.exists(path):
+            print(f"Generating {rows} synthetic responses in {path}")
+            SyntheticExport(rows, self.seed).write(path)
+        return path
+
+    def cases(self, csv_file):
+        """(name, callable) pairs for every loader method and chart-data path"""
+        export = DataLoader().load_export(csv_file)
+        topic_data = DataLoader().load_topics(export)
+        cached = DataLoader(cache_dir=os.path.join(self.data_dir, 'cache'))
+        cached.load_export(csv_file)
+        filter_loader = DataLoader()
+        cross_filter = filter_loader.build_cross_filter(export)
+
+
+        cases = [
+            ('load_csv', lambda: DataLoader().load_csv(csv_file)),
+            ('read_header', lambda: DataLoader().read_header(csv_file)),
+            ('load_export', lambda: DataLoader().load_export(csv_file)),
+            ('load_export[cached]', lambda: cached.load_export(csv_file)),
+            ('stream_csv', lambda: DataLoader().stream_csv(csv_file)),
+            ('load_topics', lambda: DataLoader().load_topics(export))
+        ]
+        for topic in TOPICS:
+            cases.append((f"load_topic[{topic}]", lambda topic=topic: DataLoader().load_topic(topic, export)))
+
+
+        for topic in TOPICS:
+            cases.append((f"cross_filter[{topic}]",
+                          lambda topic=topic: filter_loader.finalize_topic(
+                              topic, cross_filter.accumulate(topic, CROSS_FILTER_SELECTION))))
+            
+
+        cases.append(('demographic_rollups', lambda: DemographicRollups(topic_data['demographic'])))
+        for topic, data_types in TOPIC_DATA_TYPES.items():
+            for data_type in data_types:
+                cases.append((f"chart_data[{topic}/{data_type}]",
+                              lambda topic=topic, data_type=data_type: chart_data(topic_data, topic, data_type)))
+
+
+        if self.only:
+            cases = [(name, case) for name, case in cases if any(pattern in name for pattern in self.only)]
+        return cases
+
+    def measure(self, case):
+        """Best wall time over the repeats, then peak traced Python and NumPy allocation from one extra run"""
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            case()
+            timings.append(time.perf_counter() - start)
+
+
+        tracemalloc.start()
+        try:
+            case()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return min(timings), peak
+
+    def previous_results(self):
+        """Latest stored result of another version for each (rows, benchmark)"""
+        previous = {}
+        if not os.path.exists(self.results_file):
+            return previous
+
+
+        with open(self.results_file) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                if result['version'] != self.version:
+                    previous[(result['rows'], result['benchmark'])] = result
+        return previous
+
+    def run(self):
+
+        previous = self.previous_results()
+        environment = {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__}
+        results = []
+
+
+        for rows in self.sizes:
+            csv_file = self.dataset(rows)
+            with contextlib.redirect_stdout(io.StringIO()):
+                cases = self.cases(csv_file)
+
+
+            for name, case in cases:
+                with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                    warnings.simplefilter('ignore', pd.errors.DtypeWarning)
+                    seconds, peak = self.measure(case)
+                result = {'version': self.version, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'rows': rows,
+                          'benchmark': name, 'seconds': seconds, 'peak_bytes': peak, **environment}
+                results.append(result)
+                self.report(result, previous.get((rows, name)))
+
+
+        os.makedirs(os.path.dirname(self.results_file) or '.', exist_ok=True)
+        with open(self.results_file, 'a') as f:
+            for result in results:
+                f.write(json.dumps(result) + '\n')
+        return results
+
+    def report(self, result, baseline=None):
+
+        line = (f"{result['rows']:>9} {result['benchmark']:<62} {result['seconds'] * 1000:10.2f} ms "
+                f"{result['peak_bytes'] / 2 ** 20:9.1f} MiB")
+        if baseline is not None and baseline['seconds'] > 0:
+            change = (result['seconds'] / baseline['seconds'] - 1) * 100
+            line += f"  {change:+6.1f}% vs {baseline['version']}"
+        print(line)
+        sys.stdout.flush()
+
+
+def parse_args():
+
+    parser = argparse.ArgumentParser(description="Benchmark DataLoader on synthetic PATHWAYS exports")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Export sizes in rows")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark; the best is kept")
+    parser.add_argument('--only', nargs='+', default=None, help="Only run benchmarks whose name contains one of these")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Where generated exports are kept between runs")
+    parser.add_argument('--results', default=RESULTS_FILE, help="JSON lines file the results are appended to")
+    parser.add_argument('--version', default=None, help="Label for this run (defaults to git describe)")
+    return parser.parse_args()
+
+def main():
+
+    args = parse_args()
+    BenchmarkSuite(args.sizes, args.data_dir, args.results, args.version, args.repeat, only=args.only).run()
+
+if __name__ == "__main__":
+    main()
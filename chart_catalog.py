@@ -0,0 +1,106 @@
+# The charts the app offers and how each one's data and title are chosen; kept free of Tk so the
+# headless renderer and the benchmarks run on a server without a display.
+TOPIC_NAMES = ('Demographic', 'Education', 'Gender and Employment', 'Barriers to Career Goals',
+               'Confidence in Achieving Career Goals')
+
+TOPIC_DATA_TYPES = {
+    'Demographic': ('children', 'birthYear', 'maritalStatus', 'disability', 'doctoralYear'),
+    'Education': ('undergraduate_subjects', 'masters', 'doctoral'),
+    'Gender and Employment': ('fulltime_by_gender', 'fixed_term_by_gender'),
+    'Barriers to Career Goals': ('career_barriers',),
+    'Confidence in Achieving Career Goals': ('confidenceLevel',)
+}
+
+CHART_TYPES = ('bar', 'line', 'pie')
+
+TOPIC_CHART_TYPES = {
+    'Gender and Employment': ('bar', 'pie'),
+    'Barriers to Career Goals': ('bar',)
+}
+
+TOPIC_KEYS = {
+    'Demographic': 'demographic',
+    'Education': 'education',
+    'Gender and Employment': 'gender_employment',
+    'Barriers to Career Goals': 'barriers',
+    'Confidence in Achieving Career Goals': 'confidence'
+}
+
+COLORS = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#8884D8', '#82CA9D']
+
+def chart_data(topic_data, topic, data_type):
+    """Select the chart data for a topic and data type from the loader's per-topic results"""
+    demographic = topic_data.get('demographic')
+    education_data = topic_data.get('education', ([], {}))[1]
+    gender_employment_data = topic_data.get('gender_employment', {})
+    barriers_data = topic_data.get('barriers', {})
+    confidence_data = topic_data.get('confidence', {})
+    
+
+    if topic == "Demographic" and demographic:
+        return demographic.rollups().chart_data(data_type)
+    
+
+    elif topic == "Education":
+        education_type = data_type
+        if education_type in education_data:
+            return [item for item in education_data[education_type] if item['value'] > 0]
+    
+
+    elif topic == "Gender and Employment":
+        if data_type in gender_employment_data:
+            return gender_employment_data[data_type]
+            
+
+    elif topic == "Barriers to Career Goals":
+        if data_type == 'career_barriers' and 'career_barriers' in barriers_data:
+            return barriers_data['career_barriers']
+            
+
+    elif topic == "Confidence in Achieving Career Goals":
+        if data_type == 'confidenceLevel' and 'confidenceLevel' in confidence_data:
+            return confidence_data['confidenceLevel']
+    
+    return []
+
+
+def chart_title(topic, data_type):
+    """Get the chart title for a topic and data type"""
+
+    if topic == "Demographic":
+        if data_type == 'children':
+            return 'Number of Respondents by Children Ever Born'
+        elif data_type == 'birthYear':
+            return 'Number of Respondents by Birth Year'
+        elif data_type == 'maritalStatus':
+            return 'Marital Status Distribution'
+        elif data_type == 'disability':
+            return 'Disability Status Distribution'
+        elif data_type == 'doctoralYear':
+            return 'Number of Respondents by Doctoral Start Year'
+    
+
+    elif topic == "Education":
+        if data_type == 'undergraduate_subjects':
+            return 'Undergraduate Subject Areas'
+        elif data_type == 'masters':
+            return 'Masters Subject Areas'
+        elif data_type == 'doctoral':
+            return 'Doctoral Subject Areas'
+    
+
+    elif topic == "Gender and Employment":
+        if data_type == 'fulltime_by_gender':
+            return 'Percentage of Full-Time Employment by Gender'
+        elif data_type == 'fixed_term_by_gender':
+            return 'Percentage with Fixed-Term Contracts by Gender'
+            
+
+    elif topic == "Barriers to Career Goals":
+        return 'Barriers to Career Goals for Female Researchers'
+        
+
+    elif topic == "Confidence in Achieving Career Goals":
+        return 'Confidence in Achieving Research Career Goals'
+    
+    return 'Survey Data'
@@ -1,18 +1,37 @@
+import os
+import queue
+import importlib
+import threading
 import tkinter as tk
+from chart_catalog import TOPIC_KEYS, CHART_TYPES, TOPIC_CHART_TYPES, COLORS, chart_data, chart_title
 from ui_manager import UIManager
-from data_loader import DataLoader
-from data_visualizer import DataVisualizer
+from tracing import tracer
+
+CACHE_DIR_NAME = '.pathways_cache'
+
+LOAD_POLL_MS = 50
+
+WATCH_POLL_MS = 1000
+
+TOPIC_LABELS = {key: label for label, key in TOPIC_KEYS.items()}
+
+TOPICS = list(TOPIC_LABELS)
 
 class ResearcherController:
 
-    def __init__(self, root, csv_file):
+    def __init__(self, root, csv_file, chunksize=None, use_cache=True, workers=None, prefetch=True, watch=False):
 
         self.root = root
         self.root.title("Researcher Survey Visualization")
         self.root.geometry("1000x820")
-        self.csv_file = csv_file
+        # Several CSV files are treated as waves of the same survey.
+        self.csv_files = [csv_file] if isinstance(csv_file, str) else list(csv_file)
+        self.csv_file = self.csv_files[0]
+        self.chunksize = chunksize
+        self.workers = workers
+        self.prefetch = prefetch
         
-        self.COLORS = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#8884D8', '#82CA9D']
+        self.COLORS = COLORS
         
 
         self.data = None
@@ -21,65 +40,358 @@ class ResearcherController:
         self.barriers_data = {}
         self.confidence_data = {}
         self.ALL_SUBJECTS = []
+        self.export = None
+        self.wave_data = {}
+        self.cross_filter = None
+        self.filters = {}
+        self.filtered_data = {}
         
 
-        self.ui_manager = UIManager(self.root, self)
+        self.loading = False
+        self.load_queue = None
+        self.topic_requests = None
+        self.worker = None
+        self.pending_topics = set()
+        self.accumulators = {}
+        self.loaded_signature = None
+        self.watched_signature = None
         
 
-        self.data_loader = DataLoader()
+        self.dataset_version = 0
+        self.chart_cache = {}
+        self.chart_cache_hits = 0
+        self.chart_cache_misses = 0
         
 
-        self.data_visualizer = DataVisualizer(self.ui_manager.chart_frame, self.COLORS)
+        self.ui_manager = UIManager(self.root, self)
         
 
-        self.sort_method = tk.StringVar(value="alphabetical")
+        # pandas and matplotlib are imported off the Tk thread so the window appears straight away.
+        self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(self.csv_file)), CACHE_DIR_NAME) if use_cache else None
+        self.data_loader = None
+        self.data_visualizer = None
+        threading.Thread(target=importlib.import_module, args=('data_visualizer',), daemon=True).start()
         
 
-        self.load_data()
+        self.sort_method = tk.StringVar(value="alphabetical")
         
 
         self.ui_manager.topic_type.set("Gender and Employment")
+        self.load_data()
         self.update_topic_selection()
+        if watch:
+            self.root.after(WATCH_POLL_MS, self.check_source_file)
 
     def load_data(self):
+        """Start loading the CSV on a worker thread; results are applied on the Tk thread as each topic finishes"""
+        self.invalidate_chart_cache()
+        if self.topic_requests is not None:
+            self.topic_requests.put(None)
+            
+
+        # Topics are computed on demand: the one on screen first, then the demographic summary.
+        selected = TOPIC_KEYS.get(self.ui_manager.topic_type.get())
+        topics = sorted(TOPICS, key=lambda topic: (topic != selected, topic != 'demographic'))
+        
+
+        self.loading = True
+        self.pending_topics = set(TOPICS)
+        self.cross_filter = None
+        self.accumulators = {}
+        self.loaded_signature = self.watched_signature = self.source_signature()
+        self.load_queue = queue.Queue()
+        self.topic_requests = queue.Queue()
+        self.ui_manager.show_progress("Loading survey data...", 0)
+        
+
+        self.start_worker(self.load_worker, self.load_queue, self.topic_requests, topics, self.accumulators)
+        self.root.after(LOAD_POLL_MS, self.poll_load_queue, self.load_queue)
+
+    def source_signature(self):
+
+        try:
+            return tuple((stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, self.csv_files))
+        except OSError:
+            return None
+
+    def check_source_file(self):
+        """Reload the CSV once it has been replaced and has stopped changing for one poll"""
+        signature = self.source_signature()
+        if signature != self.watched_signature:
+            self.watched_signature = signature
+        elif signature is not None and signature != self.loaded_signature:
+            if self.pending_topics or self.export is None:
+                self.load_data()
+            elif not self.loading:
+                self.reload_data()
+        self.root.after(WATCH_POLL_MS, self.check_source_file)
+
+    def reload_data(self):
+        """Re-read the replaced CSV on a worker thread, reprocessing only the responses that changed"""
+        self.loaded_signature = self.watched_signature
+        self.loading = True
+        self.load_queue = queue.Queue()
+        self.ui_manager.show_progress("Reloading survey data...", 0)
+        
+
+        self.start_worker(self.reload_worker, self.load_queue, self.export, self.accumulators)
+        self.root.after(LOAD_POLL_MS, self.poll_load_queue, self.load_queue)
+
+    def start_worker(self, target, *args):
+        """Start a loader thread that first waits for the previous one, so two loads never overlap"""
+        self.worker = threading.Thread(target=self.run_worker, args=(self.worker, target, args), daemon=True)
+        self.worker.start()
+
+    def run_worker(self, previous, target, args):
+
+        if previous is not None:
+            previous.join()
+        target(*args)
 
+    def reload_worker(self, results, export, accumulators):
+        """Match the new export's responses to the old ones by ResponseId and update the topic accumulators"""
         try:
+            data_loader = self.new_data_loader()
+            new_export = data_loader.load_export(self.csv_file)
+            results.put(('progress', "Updating changed responses...", 0.5))
+            
+
+            try:
+                removed, added = data_loader.update_topics(accumulators, export, new_export)
+                print(f"Reloaded {self.csv_file}: {removed} responses removed, {added} added")
+            except ValueError as e:
+                print(f"Reprocessing all responses: {e}")
+                accumulators.update(data_loader.accumulate_topics(new_export, list(accumulators)))
+                
 
-            self.df = self.data_loader.load_csv(self.csv_file)
+            results.put(('filters', data_loader.build_cross_filter(new_export, demographic=accumulators.get('demographic'))))
+            results.put(('export', new_export))
+            for topic, accumulator in accumulators.items():
+                results.put(('topic', topic, data_loader.finalize_topic(topic, accumulator)))
+            results.put(('done',))
             
+        except Exception as e:
+            results.put(('error', e))
+
+    def new_data_loader(self):
+        """A DataLoader for one loader thread; its memo of the current export is not shared between threads"""
+        from data_loader import DataLoader
+        return DataLoader(cache_dir=self.cache_dir)
+
+    def get_data_loader(self):
+        """The Tk thread's own DataLoader, used to finalize filtered results"""
+        if self.data_loader is None:
+            self.data_loader = self.new_data_loader()
+        return self.data_loader
+
+    def get_data_visualizer(self):
+        """Create the DataVisualizer when the first chart is drawn"""
+        if self.data_visualizer is None:
+            from data_visualizer import DataVisualizer
+            self.data_visualizer = DataVisualizer(self.ui_manager.chart_frame, self.COLORS)
+        return self.data_visualizer
+
+    def request_topic(self, topic):
+        """Ask the loader thread to compute a topic that has not been evaluated yet"""
+        if topic in self.pending_topics and self.topic_requests is not None:
+            self.topic_requests.put(topic)
+
+    def load_worker(self, results, requests, topics, accumulators):
+        """Parse the export and process topics, posting messages for the Tk thread"""
+        try:
+            data_loader = self.new_data_loader()
+
+            if len(self.csv_files) > 1:
+                results.put(('progress', "Merging survey waves...", 0))
+                wave_data = data_loader.stream_waves(
+                    self.csv_files, self.chunksize, progress=lambda rows: results.put(
+                        ('progress', f"Merging survey waves... {rows} responses read", 0)))
+                results.put(('export', None))
+                results.put(('waves', wave_data))
+            elif self.chunksize:
+                results.put(('progress', "Streaming survey data...", 0))
+                topic_data = data_loader.stream_csv(
+                    self.csv_file, self.chunksize, progress=lambda rows: results.put(
+                        ('progress', f"Streaming survey data... {rows} responses read", 0)))
+                results.put(('export', None))
+                for topic in topics:
+                    results.put(('topic', topic, topic_data[topic]))
+            elif self.workers:
+                results.put(('progress', "Reading survey data...", 0))
+                results.put(('export', None))
+                topic_data = data_loader.load_topics_parallel(self.csv_file, topics, self.workers)
+                for stage, (topic, data) in enumerate(topic_data, start=1):
+                    results.put(('topic', topic, data))
+                    results.put(('progress', f"Processed {TOPIC_LABELS[topic]}", stage / len(topics)))
+            else:
+                results.put(('progress', "Reading survey data...", 0))
+                export = data_loader.load_export(self.csv_file)
+                results.put(('export', export))
+                if not self.evaluate_topics(results, requests, data_loader, export, topics, accumulators):
+                    return
+            
+
+            results.put(('done',))
+            
+        except Exception as e:
+            results.put(('error', e))
+
+    def evaluate_topics(self, results, requests, data_loader, export, topics, accumulators):
+        """Compute each topic once, as it is requested, prefetching the rest in the background if enabled.
+
+        The filter index is built as soon as no topic is waiting, whether or not the rest are ever opened.
+        """
+        remaining = list(topics)
+        for topic in remaining[:2]:
+            requests.put(topic)
+        prefetch = remaining[2:] if self.prefetch else []
+        indexed = False
+        
+
+        while remaining:
+            if not indexed and requests.empty():
+                self.index_respondents(results, data_loader, export, accumulators, len(topics) - len(remaining), len(topics))
+                indexed = True
+                if not prefetch and requests.empty():
+                    results.put(('idle',))
+                    
+
+            if prefetch:
+                try:
+                    topic = requests.get_nowait()
+                except queue.Empty:
+                    topic = prefetch.pop(0)
+            else:
+                topic = requests.get()
+                
+
+            if topic is None:
+                return False
+            if topic not in remaining:
+                continue
+                
+
+            done = len(topics) - len(remaining)
+            results.put(('progress', f"Processing {TOPIC_LABELS[topic]}...", (done + 1) / (len(topics) + 1)))
+            accumulators[topic] = data_loader.accumulate_topics(export, [topic])[topic]
+            results.put(('topic', topic, data_loader.finalize_topic(topic, accumulators[topic])))
+            remaining.remove(topic)
+            if remaining and not prefetch and requests.empty() and indexed:
+                results.put(('idle',))
+                
+
+        if not indexed:
+            self.index_respondents(results, data_loader, export, accumulators, len(topics), len(topics))
+        return True
+
+    def index_respondents(self, results, data_loader, export, accumulators, done, total):
+        """Build the filter index, reusing the demographic respondent store if that topic is already computed"""
+        results.put(('progress', "Indexing respondents for filtering...", (done + 1) / (total + 1)))
+        results.put(('filters', data_loader.build_cross_filter(export, demographic=accumulators.get('demographic'))))
+
+    def poll_load_queue(self, results):
+        """Apply queued loader messages on the Tk thread"""
+        if results is not self.load_queue:
+            return
+            
+
+        try:
+            while True:
+                self.handle_load_message(results.get_nowait())
+        except queue.Empty:
+            pass
+            
+
+        if self.loading:
+            self.root.after(LOAD_POLL_MS, self.poll_load_queue, results)
 
-            self.data = self.data_loader.load_demographic_data(self.df)
+    def handle_load_message(self, message):
+
+        kind = message[0]
+        if kind == 'progress':
+            self.ui_manager.show_progress(message[1], message[2])
             
 
-            self.ALL_SUBJECTS, self.education_data = self.data_loader.load_education_data(self.df)
+        elif kind == 'export':
+            self.export = message[1]
             
 
-            self.gender_employment_data = self.data_loader.load_gender_employment_data(self.df)
+        elif kind == 'topic':
+            self.apply_topic_data(message[1], message[2])
             
 
-            self.barriers_data = self.data_loader.process_barriers_data(self.df)
+        elif kind == 'filters':
+            self.cross_filter = message[1]
+            self.ui_manager.show_filters({name: self.cross_filter.values(name) for name in self.cross_filter.dimensions})
+            self.filters = self.ui_manager.get_filters()
+            if self.is_filtered():
+                self.update_filters()
             
 
-            self.confidence_data = self.data_loader.process_confidence_data(self.df)
+        elif kind == 'waves':
+            self.wave_data = message[1]
+            self.ui_manager.show_waves(list(self.wave_data))
+            self.update_wave_selection()
             
 
+        elif kind in ('idle', 'done'):
+            self.loading = kind == 'idle'
+            self.ui_manager.hide_progress()
             self.update_data_summary()
             
-        except Exception as e:
+
+        elif kind == 'error':
+            e = message[1]
+            self.loading = False
+            self.pending_topics = set()
+            self.ui_manager.hide_progress()
             print(f"Error loading data: {e}")
+            self.clear_chart_frame()
             tk.Label(self.ui_manager.chart_frame, text=f"Error loading data: {e}", foreground="red").pack(pady=20)
 
+    def apply_topic_data(self, topic, data):
+        """Store one topic's results and redraw if it is the topic on screen"""
+        if topic == 'demographic':
+            self.data = data
+        elif topic == 'education':
+            self.ALL_SUBJECTS, self.education_data = data
+        elif topic == 'gender_employment':
+            self.gender_employment_data = data
+        elif topic == 'barriers':
+            self.barriers_data = data
+        elif topic == 'confidence':
+            self.confidence_data = data
+            
+
+        self.pending_topics.discard(topic)
+        self.filtered_data.pop(topic, None)
+        self.invalidate_chart_cache()
+        if TOPIC_KEYS.get(self.ui_manager.topic_type.get()) == topic:
+            self.update_chart()
+
+    def is_topic_loading(self, topic):
+
+        return TOPIC_KEYS.get(topic) in self.pending_topics
+
+    def invalidate_chart_cache(self):
+        """Drop cached chart results so the next view reads the freshly loaded dataset"""
+        self.dataset_version += 1
+        self.chart_cache.clear()
+
     def update_data_summary(self):
         """Update the data summary displayed in the UI"""
         if not self.data:
             return
             
 
-        valid_birth_years = [r['birthYear'] for r in self.data if r['birthYear'] is not None and 1900 <= r['birthYear'] <= 2025]
-        min_year = min(valid_birth_years) if valid_birth_years else "N/A"
-        max_year = max(valid_birth_years) if valid_birth_years else "N/A"
+        birth_years = self.data.valid_values('birthYear')
+        valid_birth_years = birth_years[(birth_years >= 1900) & (birth_years <= 2025)]
+        min_year = int(valid_birth_years.min()) if len(valid_birth_years) else "N/A"
+        max_year = int(valid_birth_years.max()) if len(valid_birth_years) else "N/A"
         
         summary_text = f"Total respondents: {len(self.data)} | Years represented: {min_year}-{max_year}"
+        if self.is_filtered():
+            summary_text += f" | Matching filters: {self.cross_filter.count(self.filters)}"
         self.ui_manager.data_summary.config(text=summary_text)
 
     def update_topic_selection(self, event=None):
@@ -92,34 +404,68 @@ class ResearcherController:
 
         self.update_chart()
 
+    def update_wave_selection(self, event=None):
+        """Show the charts for the selected wave, or for all waves pooled"""
+        topic_data = self.wave_data.get(self.ui_manager.wave.get())
+        if topic_data is None:
+            return
+            
+
+        for topic, data in topic_data.items():
+            self.apply_topic_data(topic, data)
+        self.update_data_summary()
+
+    def update_filters(self, event=None):
+        """Re-slice the charts after a change in the filter bar"""
+        self.filters = self.ui_manager.get_filters()
+        self.filtered_data = {}
+        self.invalidate_chart_cache()
+        self.update_data_summary()
+        self.update_chart()
+
+    def is_filtered(self):
+
+        return self.cross_filter is not None and any(selected is not None for selected in self.filters.values())
+
+    def filtered_topic_data(self, topic):
+        """A topic's results for the respondents matching the filters, computed once per filter selection"""
+        if topic not in self.filtered_data:
+            accumulator = self.cross_filter.accumulate(topic, self.filters) if topic in self.cross_filter.sources else None
+            self.filtered_data[topic] = self.get_data_loader().finalize_topic(topic, accumulator)
+        return self.filtered_data[topic]
+
     def update_data_type(self, event=None):
         """Handle data type selection changes"""
         self.update_chart()
     
     def update_education_data(self, event=None):
         """Handle education data type selection changes"""
-        for widget in self.ui_manager.chart_frame.winfo_children():
-            widget.destroy()
+        self.clear_chart_frame()
+        if self.is_topic_loading(self.ui_manager.topic_type.get()):
+            self.update_chart()
+            return
             
         education_type = self.ui_manager.data_type.get()
         
         if education_type in self.education_data and self.education_data[education_type]:
 
-            self.ui_manager.chart_combo['values'] = ('bar', 'line', 'pie')
+            self.ui_manager.chart_combo['values'] = CHART_TYPES
             self.update_chart()
         else:
             tk.Label(self.ui_manager.chart_frame, text=f"No data available for {education_type}").pack(pady=20)
     
     def update_gender_employment_data(self, event=None):
         """Handle gender employment data type selection changes"""
-        for widget in self.ui_manager.chart_frame.winfo_children():
-            widget.destroy()
+        self.clear_chart_frame()
+        if self.is_topic_loading(self.ui_manager.topic_type.get()):
+            self.update_chart()
+            return
             
         data_type = self.ui_manager.data_type.get()
         
         if data_type in self.gender_employment_data and self.gender_employment_data[data_type]:
 
-            self.ui_manager.chart_combo['values'] = ('bar', 'pie')
+            self.ui_manager.chart_combo['values'] = TOPIC_CHART_TYPES["Gender and Employment"]
             
 
             if self.ui_manager.chart_type.get() == 'line':
@@ -134,93 +480,82 @@ class ResearcherController:
         if not hasattr(self.ui_manager, 'data_type'):
             return []
             
-        topic = self.ui_manager.topic_type.get()
-        data_type = self.ui_manager.data_type.get()
-        
-
-        if topic == "Demographic" and self.data:
-            return self.data_loader.get_demographic_chart_data(self.data, data_type)
-        
-
-        elif topic == "Education":
-            education_type = data_type
-            if education_type in self.education_data:
-                return [item for item in self.education_data[education_type] if item['value'] > 0]
-        
+        return self.get_cached_chart(self.ui_manager.topic_type.get(), self.ui_manager.data_type.get())[0]
 
-        elif topic == "Gender and Employment":
-            if data_type in self.gender_employment_data:
-                return self.gender_employment_data[data_type]
-                
-
-        elif topic == "Barriers to Career Goals":
-            if data_type == 'career_barriers' and 'career_barriers' in self.barriers_data:
-                return self.barriers_data['career_barriers']
-                
-
-        elif topic == "Confidence in Achieving Career Goals":
-            if data_type == 'confidenceLevel' and 'confidenceLevel' in self.confidence_data:
-                return self.confidence_data['confidenceLevel']
-        
-        return []
-        
     def get_chart_title(self):
         """Get the title for the current chart"""
         if not hasattr(self.ui_manager, 'data_type'):
             return 'Survey Data'
             
-        topic = self.ui_manager.topic_type.get()
-        data_type = self.ui_manager.data_type.get()
-        
-
-        if topic == "Demographic":
-            if data_type == 'children':
-                return 'Number of Respondents by Children Ever Born'
-            elif data_type == 'birthYear':
-                return 'Number of Respondents by Birth Year'
-            elif data_type == 'maritalStatus':
-                return 'Marital Status Distribution'
-            elif data_type == 'disability':
-                return 'Disability Status Distribution'
-            elif data_type == 'doctoralYear':
-                return 'Number of Respondents by Doctoral Start Year'
-        
-
-        elif topic == "Education":
-            if data_type == 'undergraduate_subjects':
-                return 'Undergraduate Subject Areas'
-            elif data_type == 'masters':
-                return 'Masters Subject Areas'
-            elif data_type == 'doctoral':
-                return 'Doctoral Subject Areas'
-        
-
-        elif topic == "Gender and Employment":
-            if data_type == 'fulltime_by_gender':
-                return 'Percentage of Full-Time Employment by Gender'
-            elif data_type == 'fixed_term_by_gender':
-                return 'Percentage with Fixed-Term Contracts by Gender'
+        return self.get_cached_chart(self.ui_manager.topic_type.get(), self.ui_manager.data_type.get())[1]
+
+    def get_cached_chart(self, topic, data_type):
+        """Return (chart data, title) for a selection, computing it once per dataset version"""
+        key = (topic, data_type, self.dataset_version)
+        with tracer.span('get_chart_data', topic=topic, data_type=data_type) as span:
+            if key in self.chart_cache:
+                self.chart_cache_hits += 1
+                span.set(cache='hit')
+                return self.chart_cache[key]
                 
 
-        elif topic == "Barriers to Career Goals":
-            return 'Barriers to Career Goals for Female Researchers'
+            self.chart_cache_misses += 1
+            span.set(cache='miss')
+            result = (self.chart_data_for(topic, data_type), self.chart_title_for(topic, data_type))
+            self.chart_cache[key] = result
+            return result
+
+    def chart_data_for(self, topic, data_type):
+        """Compute the chart data for a topic and data type"""
+        topic_data = self.topic_data()
+        if self.is_filtered() and topic in TOPIC_KEYS:
+            topic_data[TOPIC_KEYS[topic]] = self.filtered_topic_data(TOPIC_KEYS[topic])
+        return chart_data(topic_data, topic, data_type)
+
+    def chart_title_for(self, topic, data_type):
+        """Get the title for a topic and data type"""
+        genders = self.filters.get('gender') if self.is_filtered() else None
+        if topic == "Barriers to Career Goals" and genders:
+            return f"Barriers to Career Goals for {' and '.join(sorted(genders))} Researchers"
+        return chart_title(topic, data_type)
+
+    def topic_data(self):
+        """The loaded results keyed by loader topic"""
+        return {
+            'demographic': self.data,
+            'education': (self.ALL_SUBJECTS, self.education_data),
+            'gender_employment': self.gender_employment_data,
+            'barriers': self.barriers_data,
+            'confidence': self.confidence_data
+        }
+
+    def clear_chart_frame(self):
+        """Remove status messages from the chart area, keeping the visualizer's canvas for reuse"""
+        canvas_widget = None
+        if self.data_visualizer is not None:
+            self.data_visualizer.hide_chart()
+            canvas_widget = self.data_visualizer.canvas_widget
             
 
-        elif topic == "Confidence in Achieving Career Goals":
-            return 'Confidence in Achieving Research Career Goals'
-        
-        return 'Survey Data'
-        
+        for widget in self.ui_manager.chart_frame.winfo_children():
+            if widget is not canvas_widget:
+                widget.destroy()
+
     def update_chart(self, event=None):
         """Update the visualization based on current selections"""
 
-        for widget in self.ui_manager.chart_frame.winfo_children():
-            widget.destroy()
+        self.clear_chart_frame()
             
 
         if not hasattr(self.ui_manager, 'data_type') or not self.ui_manager.topic_type.get():
             tk.Label(self.ui_manager.chart_frame, text="Please select a topic and data type to view visualization").pack(pady=20)
             return
+            
+
+        if self.is_topic_loading(self.ui_manager.topic_type.get()):
+            self.request_topic(TOPIC_KEYS[self.ui_manager.topic_type.get()])
+            tk.Label(self.ui_manager.chart_frame, text=f"Loading {self.ui_manager.topic_type.get()} data...").pack(pady=20)
+            return
         
         chart_data = self.get_chart_data()
         if not chart_data:
@@ -237,7 +572,7 @@ class ResearcherController:
 
         title = self.get_chart_title()
 
-        self.data_visualizer.create_chart(
+        self.get_data_visualizer().create_chart(
             chart_data, 
             chart_type, 
             title, 
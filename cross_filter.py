@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from respondent_store import RespondentStore, RespondentSelection
+
+class CrossFilter:
+    """Packed per-value bitmaps over the respondents of one export, and the row-level inputs of every topic.
+
+    A filter maps a dimension to the values it keeps (a set, or a range for years). Selected values are
+    OR'd within a dimension and AND'd across dimensions, and each topic is re-accumulated from the rows
+    left in the mask.
+    """
+
+    def __init__(self, size):
+
+        self.size = size
+        self.dimensions = {}
+        self.sources = {}
+        self.topic_filters = {}
+
+    def add_dimension(self, name, values):
+
+        codes, uniques = pd.factorize(pd.Series(values), sort=True)
+        bitmaps = np.zeros((len(uniques), (self.size + 7) // 8), dtype=np.uint8)
+        for code in range(len(uniques)):
+            bitmaps[code] = np.packbits(codes == code)
+        self.dimensions[name] = (list(uniques), bitmaps)
+
+    def values(self, name):
+
+        return self.dimensions[name][0] if name in self.dimensions else []
+
+    def add_topic(self, topic, accumulator, rows, inputs, add=None, filters=None):
+        """Register a topic: an empty accumulator, the row of each input item and how to add them.
+
+        rows is None when the inputs have one item per respondent, in order. filters are applied to this
+        topic when the user has not filtered the same dimension.
+        """
+        rows = np.asarray(rows) if rows is not None else None
+        self.sources[topic] = (accumulator, rows, inputs, add or type(accumulator).add)
+        if filters:
+            self.topic_filters[topic] = filters
+
+    def bitmap(self, filters):
+        """Packed bitmap of the respondents matching every filter, or None when nothing is filtered"""
+        bits = None
+        for name, selected in filters.items():
+            if name not in self.dimensions or selected is None:
+                continue
+
+
+            values, bitmaps = self.dimensions[name]
+            chosen = [code for code, value in enumerate(values) if value in selected]
+            if chosen:
+                dimension_bits = np.bitwise_or.reduce(bitmaps[chosen], axis=0)
+            else:
+                dimension_bits = np.zeros(bitmaps.shape[1], dtype=np.uint8)
+            bits = dimension_bits if bits is None else bits & dimension_bits
+        return bits
+
+    def mask(self, filters):
+
+        bits = self.bitmap(filters)
+        if bits is None:
+            return None
+        return np.unpackbits(bits, count=self.size).view(bool)
+
+    def count(self, filters):
+
+        bits = self.bitmap(filters)
+        if bits is None:
+            return self.size
+        return int(np.unpackbits(bits, count=self.size).sum())
+
+    def accumulate(self, topic, filters):
+        """A fresh accumulator for the topic over the respondents matching the filters"""
+        filters = {**self.topic_filters.get(topic, {}), **{name: selected for name, selected in filters.items()
+                                                          if selected is not None}}
+        template, rows, inputs, add = self.sources[topic]
+        mask = self.mask(filters)
+        if mask is None:
+            keep = np.ones(len(rows) if rows is not None else self.size, dtype=bool)
+        else:
+            keep = mask.take(rows) if rows is not None else mask
+
+
+        accumulator = template.empty()
+        add(accumulator, *[_select(value, keep) for value in inputs])
+        return accumulator
+
+
+def _select(value, keep):
+
+    if isinstance(value, RespondentStore):
+        return RespondentSelection(value, keep)
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return value[keep]
+    if isinstance(value, np.ndarray):
+        return value.compress(keep, axis=0)
+    return value
@@ -1,12 +1,102 @@
+import os
+import shutil
+import tempfile
+import multiprocessing
 import pandas as pd
 import numpy as np
 from collections import Counter
+from cross_filter import CrossFilter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataset_cache import DatasetCache
+from keyword_classifier import KeywordClassifier
+from respondent_store import RespondentStore, BIRTH_YEAR_RANGE, DOCTORAL_YEAR_RANGE
+from subject_index import SubjectIndex
+from survey_export import SurveyExport, FIRST_RESPONSE_ROW
+from survey_schema import SurveySchema
+from survey_waves import SurveyWaves, POOLED_WAVE
+from tracing import tracer
+from topic_accumulators import (DemographicAccumulator, SubjectAccumulator, GenderEmploymentAccumulator,
+                                BarrierAccumulator, ConfidenceAccumulator)
+
+DEFAULT_CHUNKSIZE = 50000
+
+GENDERS = ['Female', 'Male']
+
+NO_BARRIER_ANSWERS = ['', 'n/a', 'none', 'no', 'not applicable']
+
+BARRIER_CATEGORIES = {
+    "Work-life balance": ["work life", "work-life", "balance", "family", "personal life","fixed term"],
+    "Childcare responsibilities": ["child", "children", "parenting", "maternity", "baby", "infant","kids"],
+    "Limited funding": ["fund", "money", "financial", "budget", "grant", "resource","low-payment","funding","poor"],
+    "Lack of mentoring": ["mentor","mentoring", "guidance", "supervision", "support", "advising"],
+    "Gender bias": ["gender", "bias", "discrimination", "sexism", "woman", "female", "equality"],
+    "Heavy workload": ["workload", "overwork", "busy", "time", "burden", "pressure", "stress", "admin"],
+    "Lack of flexibility": ["rigid", "flex", "schedule", "hours", "remote", "accommodat"],
+    "Field competition": ["compet", "crowd", "saturated", "job market", "position", "limited openings","competing"],
+    "Health issues": ["health", "illness", "medical", "mental health", "burnout", "depression", "anxiety"],
+    "Geographic limitations": ["location", "geograph", "mobility", "relocate", "move", "travel"]
+}
+
+OTHER_SUBJECT = "Other (Specify Below)"
+
+CONFIDENCE_LEVELS = {
+    'very confident': 'Very Confident',
+    'extremely confident': 'Very Confident',
+    'confident': 'Confident',
+    'fairly confident': 'Confident',
+    'quite confident': 'Confident',
+    'somewhat confident': 'Somewhat Confident',
+    'moderately confident': 'Somewhat Confident',
+    'not very confident': 'Not Very Confident',
+    'slightly confident': 'Not Very Confident',
+    'a little confident': 'Not Very Confident',
+    'not confident': 'Not Confident',
+    'not at all confident': 'Not Confident'
+}
+
+TOPICS = ['demographic', 'education', 'gender_employment', 'barriers', 'confidence']
+
+DEMOGRAPHIC_FIELDS = ['birthYear', 'nationality', 'childrenYesNo', 'childrenCount', 'maritalStatus', 'disability',
+                      'doctoralYear', 'confidenceLevel']
+
+SUBJECT_FIELDS = ['undergraduate_subjects', 'masters', 'doctoral']
+
+TOPIC_FIELDS = {
+    'demographic': DEMOGRAPHIC_FIELDS,
+    'education': SUBJECT_FIELDS,
+    'gender_employment': ['gender', 'employment', 'fixedTerm'],
+    'barriers': ['gender', 'barriers'],
+    'confidence': ['gender', 'confidenceLevel']
+}
+
+TOPIC_DEFAULTS = {
+    'demographic': RespondentStore,
+    'education': lambda: ([], {}),
+    'gender_employment': dict,
+    'barriers': dict,
+    'confidence': dict
+}
+
+TOPIC_ERRORS = {
+    'demographic': "Error loading demographic data",
+    'education': "Error processing education data",
+    'gender_employment': "Error processing gender and employment data",
+    'barriers': "Error processing barriers data",
+    'confidence': "Error processing confidence data"
+}
 
 class DataLoader:
 
-    def __init__(self):
-        pass
+    def __init__(self, cache_dir=None):
+
+        self.cache = DatasetCache(cache_dir) if cache_dir else None
+        self._export = None
+        self._respondents = None
+        self._source = None
+        self._subject_index = None
+        self.barrier_classifier = KeywordClassifier(BARRIER_CATEGORIES)
         
+    @tracer.traced('load_csv')
     def load_csv(self, csv_file):
         try:
             df = pd.read_csv(csv_file, header=None)
@@ -14,620 +104,712 @@ class DataLoader:
         except Exception as e:
             print(f"Error loading CSV file: {e}")
             raise
-            
-    def load_demographic_data(self, df):
 
-        try:
+    @tracer.traced('read_header')
+    def read_header(self, csv_file):
 
-            questions_row = df.iloc[1]
+        return pd.read_csv(csv_file, header=None, nrows=FIRST_RESPONSE_ROW, dtype=str)
 
-            col_indices = {}
-            for i, question in enumerate(questions_row):
-                if not isinstance(question, str):
-                    continue
-                
-                question = question.lower()
-                if 'year were you born' in question:
-                    col_indices['birthYear'] = i
-                elif 'nationality' in question:
-                    col_indices['nationality'] = i
-                elif 'do you have children' in question:
-                    col_indices['childrenYesNo'] = i
-                elif 'how many children' in question:
-                    col_indices['childrenCount'] = i
-                elif 'marital status' in question:
-                    col_indices['maritalStatus'] = i
-                elif 'disability' in question:
-                    col_indices['disability'] = i
-                elif 'year did you begin your doctorate' in question:
-                    col_indices['doctoralYear'] = i
-                elif 'confident are you that you will achieve' in question:
-                    col_indices['confidenceLevel'] = i
-
-            responses = df.iloc[4:].copy()
-            
+    def read_schema(self, header):
 
-            data = []
-            for i, row in responses.iterrows():
-                try:
-                    birth_year = int(row[col_indices['birthYear']]) if pd.notna(row[col_indices['birthYear']]) else None
-                    if birth_year and (birth_year < 1900 or birth_year > 2025):
-                        birth_year = None
-                except (ValueError, TypeError):
-                    birth_year = None
-                    
-                try:
-                    children_count = int(row[col_indices['childrenCount']]) if pd.notna(row[col_indices['childrenCount']]) else 0
-                except (ValueError, TypeError):
-                    children_count = 0
+        schema = SurveySchema.from_header(header)
+        for problem in schema.problems:
+            print(f"Survey layout: {problem}")
+        return schema
+
+    def required_columns(self, header, topics=TOPICS, schema=None):
+
+        schema = schema or SurveySchema.from_header(header)
+        columns = {schema.get('responseId')}
+        for topic in topics:
+            for field in TOPIC_FIELDS[topic]:
+                col_index = schema.get(field)
+                columns.add(col_index)
+                if field in SUBJECT_FIELDS and col_index is not None:
+                    columns.add(schema.text_column(col_index))
                     
-                try:
-                    doctoral_year = int(row[col_indices['doctoralYear']]) if pd.notna(row[col_indices['doctoralYear']]) else None
-                    if doctoral_year and (doctoral_year < 1950 or doctoral_year > 2025):
-                        doctoral_year = None
-                except (ValueError, TypeError):
-                    doctoral_year = None
-                
-                disability_value = str(row[col_indices['disability']]).strip() if pd.notna(row[col_indices['disability']]) else 'No'
-                
-                respondent = {
-                    'id': i - 3,
-                    'birthYear': birth_year,
-                    'nationality': str(row[col_indices['nationality']]).strip() if pd.notna(row[col_indices['nationality']]) else '',
-                    'hasChildren': str(row[col_indices['childrenYesNo']]) == 'Yes',
-                    'childrenCount': children_count,
-                    'maritalStatus': str(row[col_indices['maritalStatus']]).strip() if pd.notna(row[col_indices['maritalStatus']]) else '',
-                    'disabilityStatus': disability_value,
-                    'doctoralYear': doctoral_year,
-                    'confidenceLevel': str(row[col_indices['confidenceLevel']]).strip() if pd.notna(row[col_indices['confidenceLevel']]) else ''
-                }
-                data.append(respondent)
+
+        return sorted(col_index for col_index in columns if col_index is not None and col_index < len(header.columns))
+
+    def read_responses(self, csv_file, columns=None, chunksize=None):
+
+        try:
+            return pd.read_csv(csv_file, header=None, skiprows=FIRST_RESPONSE_ROW, usecols=columns,
+                               dtype=str, chunksize=chunksize)
+        except pd.errors.EmptyDataError:
+            empty = pd.DataFrame(columns=columns, dtype=str)
+            return iter([empty]) if chunksize else empty
+
+    @tracer.traced('load_export')
+    def load_export(self, csv_file, topics=TOPICS, compact=True):
+
+        return self._load_export(self.cache, csv_file, topics, compact)[0]
+
+    def _load_export(self, cache, csv_file, topics=TOPICS, compact=True):
+
+        cache_key = None
+        if cache is not None:
+            with tracer.span('cache_lookup') as span:
+                cache_key = cache.key_for(csv_file)
+                export = cache.load(cache_key)
+                hit = export is not None and self._export_covers(export, topics)
+                span.set(hit=hit)
+            if hit:
+                return export, cache_key
                 
-            return data
-            
-        except Exception as e:
-            print(f"Error loading demographic data: {e}")
-            return []
-    
-    def get_demographic_chart_data(self, data, data_type):
 
-        if data_type == 'children':
-            children_counts = [r['childrenCount'] for r in data if r['hasChildren'] and r['childrenCount'] > 0]
-            count_frequency = Counter(children_counts)
-            return [{'name': f"{count}", 'value': frequency} 
-                  for count, frequency in sorted(count_frequency.items())]
-            
-        elif data_type == 'birthYear':
-            valid_birth_years = [r['birthYear'] for r in data 
-                               if r['birthYear'] is not None and 1900 <= r['birthYear'] <= 2025]
-            year_counts = Counter(valid_birth_years)
-            return [{'name': str(year), 'value': count} for year, count in sorted(year_counts.items())]
-            
-        elif data_type == 'maritalStatus':
-            status_count = {}
-            for r in data:
-                if r['maritalStatus']:
-                    status_count[r['maritalStatus']] = status_count.get(r['maritalStatus'], 0) + 1
-            return [{'name': name, 'value': value} for name, value in status_count.items()]
-            
-        elif data_type == 'disability':
-            disability_count = {'Yes': 0, 'No': 0, 'Unsure': 0}
-            for r in data:
-                status = r['disabilityStatus']
-                if status not in disability_count:
-                    status = 'No'
-                disability_count[status] += 1
-            
-            ordered_results = []
-            for category in ['Yes', 'Unsure', 'No']:
-                if disability_count[category] > 0:
-                    ordered_results.append({'name': category, 'value': disability_count[category]})
-            return ordered_results
-            
-        elif data_type == 'doctoralYear':
-            valid_doctoral_years = [r['doctoralYear'] for r in data 
-                                  if r['doctoralYear'] is not None and 1950 <= r['doctoralYear'] <= 2025]
-            year_counts = Counter(valid_doctoral_years)
-            return [{'name': str(year), 'value': count} for year, count in sorted(year_counts.items())]
+        header = self.read_header(csv_file)
+        schema = self.read_schema(header)
+        columns = self.required_columns(header, topics, schema) if topics is not None else None
+        with tracer.span('read_responses', columns=len(columns) if columns is not None else None) as span:
+            responses = self.read_responses(csv_file, columns)
+            span.set(rows=len(responses))
+        responses.index = pd.RangeIndex(FIRST_RESPONSE_ROW, FIRST_RESPONSE_ROW + len(responses))
+        
+
+        export = SurveyExport(header, responses, schema=schema)
+        if compact:
+            with tracer.span('compact'):
+                export.compact()
             
-        return []
+
+        if cache is not None:
+            with tracer.span('cache_store'):
+                cache.store(cache_key, csv_file, export)
+        return export, cache_key
+
+    def _export_covers(self, export, topics):
+
+        if topics is None:
+            return len(export.responses.columns) == export.column_count
+        return set(self.required_columns(export.header, topics, export.schema)) <= set(export.responses.columns)
+
+    def load_topics_parallel(self, csv_file, topics=TOPICS, workers=None):
+        """Process topics across a pool of worker processes, yielding (topic, data) as each one finishes.
+
+        Workers memory-map the columnar dataset cache entry instead of receiving a pickled DataFrame,
+        read only the columns of their own topic and send back their accumulators, which are finalized
+        here; without a cache a scratch entry is written for the duration of the run.
+        """
+        cache = self.cache
+        scratch_dir = None
+        if cache is None:
+            scratch_dir = tempfile.mkdtemp(prefix='pathways-')
+            cache = DatasetCache(scratch_dir)
             
-    def extract_unique_subjects(self, df, subject_cols):
 
-        unique_subjects = set()
+        try:
+            export, cache_key = self._load_export(cache, csv_file, topics)
+            workers = min(workers or os.cpu_count() or 1, len(topics))
+            
+
+            # Spawned workers stay clear of the Tk and loader threads running in this process.
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = [pool.submit(accumulate_cached_topic, cache.cache_dir, cache_key, topic,
+                                       self.required_columns(export.header, [topic], export.schema))
+                           for topic in topics]
+                for future in as_completed(futures):
+                    topic, accumulator = future.result()
+                    yield topic, self.finalize_topic(topic, accumulator)
+        finally:
+            if scratch_dir is not None:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    @tracer.traced('stream_csv')
+    def stream_csv(self, csv_file, chunksize=DEFAULT_CHUNKSIZE, topics=TOPICS, progress=None):
+
+        accumulators = None
+        rows_read = 0
         
 
-        for i in range(4, len(df)):
-            for col_index in subject_cols:
-                if col_index >= len(df.columns):
-                    continue
+        try:
+            header = self.read_header(csv_file)
+            schema = self.read_schema(header)
+            reader = self.read_responses(csv_file, self.required_columns(header, topics, schema), chunksize)
+            for chunk in reader:
+                chunk.index = chunk.index + FIRST_RESPONSE_ROW
+                export = SurveyExport(header, chunk, schema=schema)
+                rows_read += len(chunk)
+                if progress is not None:
+                    progress(rows_read)
                     
-                subject_value = df.iloc[i][col_index]
-                if pd.notna(subject_value) and subject_value:
 
-                    subjects = str(subject_value).split(',')
-                    
-                    for subject in subjects:
-                        subject = subject.strip()
-                        if subject and subject != "Other (Specify Below)":
-                            unique_subjects.add(subject)
+                active = topics if accumulators is None else [
+                    topic for topic in topics if accumulators[topic] is not None]
+                accumulators = self.merge_topics(accumulators, self.accumulate_topics(export, active))
+        except Exception as e:
+            print(f"Error streaming CSV file: {e}")
+            raise
+            
+
+        return self.finalize_topics(accumulators)
+
+    @tracer.traced('stream_waves')
+    def stream_waves(self, csv_files, chunksize=None, topics=TOPICS, progress=None):
+        """Stream several waves of the survey chunk by chunk, returning topic data for each wave and pooled.
+
+        Columns are matched to the first wave's layout by question. A respondent whose ResponseId was
+        already seen in an earlier wave is shown in both waves but counted once in the pooled data.
+        """
+        waves = SurveyWaves(csv_files, self.read_header)
+        for label, schema in zip(waves.labels, waves.schemas):
+            for problem in schema.problems:
+                print(f"Survey layout of {label}: {problem}")
+        columns = self.required_columns(waves.header, topics, waves.schema)
+        response_id_col = waves.schema.column('responseId')
+        seen = set()
+        wave_accumulators = {}
+        pooled_parts = []
+        rows_read = 0
         
 
-        return sorted(list(unique_subjects))
+        try:
+            for label, csv_file, column_map in waves:
+                wave_columns = waves.wave_columns(column_map, columns)
+                wave_seen = set()
+                accumulators = None
+                repeated = None
+                repeats = 0
+                # Rows are numbered on from the earlier waves so respondent ids stay unique once pooled.
+                wave_start = rows_read
+                reader = self.read_responses(csv_file, sorted(wave_columns), chunksize or DEFAULT_CHUNKSIZE)
+                for chunk in reader:
+                    chunk.index = chunk.index + FIRST_RESPONSE_ROW + wave_start
+                    chunk = chunk.rename(columns=wave_columns).reindex(columns=columns)
+                    rows_read += len(chunk)
+                    if progress is not None:
+                        progress(rows_read)
+                        
+
+                    # Hash lookups on ResponseId: repeats within a wave are dropped, repeats of an earlier wave
+                    # are accumulated separately so they can be taken out of the pooled totals.
+                    response_ids = chunk[response_id_col]
+                    duplicate = response_ids.notna() & (response_ids.duplicated() |
+                                                        response_ids.map(wave_seen.__contains__).astype(bool))
+                    chunk = chunk[~duplicate.to_numpy()]
+                    response_ids = chunk[response_id_col]
+                    earlier = response_ids.map(seen.__contains__).astype(bool).to_numpy()
+                    wave_seen.update(response_ids.dropna())
+                    
 
-    def standardize_subject(self, subject, all_subjects):
+                    active = topics if accumulators is None else [
+                        topic for topic in topics if accumulators[topic] is not None]
+                    accumulators = self.merge_topics(accumulators,
+                                                     self.accumulate_topics(SurveyExport(waves.header, chunk, schema=waves.schema), active))
+                    repeats += int(earlier.sum())
+                    if earlier.any():
+                        repeated = self.merge_topics(repeated, self.accumulate_topics(
+                            SurveyExport(waves.header, chunk[earlier], schema=waves.schema), topics))
+                        
+
+                seen.update(wave_seen)
+                wave_accumulators[label] = accumulators
+                pooled_parts.append(self.pool_topics([accumulators], topics, subtract=repeated))
+                if repeats:
+                    print(f"{repeats} respondents in {label} were already counted in an earlier wave")
+        except Exception as e:
+            print(f"Error streaming survey waves: {e}")
+            raise
+            
 
+        wave_data = {POOLED_WAVE: self.finalize_topics(self.pool_topics(pooled_parts, topics))}
+        for label, accumulators in wave_accumulators.items():
+            wave_data[label] = self.finalize_topics(accumulators)
+        return wave_data
+
+    def pool_topics(self, topic_accumulators, topics=TOPICS, subtract=None):
+        """Merge several sets of per-topic accumulators into new ones, leaving the inputs untouched"""
+        pooled = {}
+        for topic in topics:
+            parts = [accumulators[topic] for accumulators in topic_accumulators]
+            removed = subtract[topic] if subtract is not None else None
+            if any(part is None for part in parts) or (subtract is not None and removed is None):
+                pooled[topic] = None
+                continue
+                
 
-        subject = subject.strip()
-        
+            pooled[topic] = parts[0].empty()
+            for part in parts:
+                pooled[topic].merge(part)
+            if removed is not None:
+                pooled[topic].subtract(removed)
+        return pooled
 
-        if subject in all_subjects:
-            return subject
-                
+    def get_export(self, df):
 
-        for std_subject in all_subjects:
-            if subject.lower() == std_subject.lower():
-                return std_subject
-                
+        if self._source is not df:
+            self._export = df if isinstance(df, SurveyExport) else SurveyExport.from_frame(df)
+            self._respondents = None
+            self._source = df
+        return self._export
+            
+    def get_respondent_table(self, df):
 
-        for std_subject in all_subjects:
-            if subject.lower() in std_subject.lower() or std_subject.lower() in subject.lower():
+        export = self.get_export(df)
+        if self._respondents is None:
+            self._respondents = self.build_respondent_table(export)
+        return self._respondents
 
-                return std_subject
-                
+    def build_respondent_table(self, export):
 
-        return "Other"
+        responses = export.responses
+        schema = export.schema
+        respondents = pd.DataFrame(index=responses.index)
         
-    def process_subject_data(self, df, row_index, subject_col_index, subject_dict, other_count, all_subjects, other_text_col=None):
 
-        if subject_col_index >= len(df.columns):
-            return other_count
-            
-        subject_value = df.iloc[row_index][subject_col_index]
-        if pd.notna(subject_value) and subject_value:
+        gender = self._text_column(responses, schema.get('gender')).str.lower()
+        is_female = gender.str.contains('female', regex=False) | (gender == 'f')
+        is_male = ~is_female & (gender.str.contains('male', regex=False) | (gender == 'm'))
+        gender_codes = np.where(is_female, 0, np.where(is_male, 1, -1))
+        respondents['gender'] = pd.Categorical.from_codes(gender_codes, categories=GENDERS)
+        
 
-            subjects = str(subject_value).split(',')
-            
-            for subject in subjects:
-                subject = subject.strip()
-                if subject:
-                    if subject == "Other (Specify Below)" and other_text_col is not None:
-                        if row_index < len(df) and other_text_col < len(df.columns) and pd.notna(df.iloc[row_index][other_text_col]):
-                            other_subject = str(df.iloc[row_index][other_text_col]).strip()
-                            if other_subject:
-                                std_subject = self.standardize_subject(other_subject, all_subjects)
-                                if std_subject == "Other":
-                                    other_count += 1
-                                else:
-                                    subject_dict[std_subject] = subject_dict.get(std_subject, 0) + 1
-                    else:
-                        std_subject = self.standardize_subject(subject, all_subjects)
-                        if std_subject == "Other":
-                            other_count += 1
-                        else:
-                            subject_dict[std_subject] = subject_dict.get(std_subject, 0) + 1
-                            
-        return other_count
+        employment = self._text_column(responses, schema.get('employment')).str.lower()
+        respondents['fulltime'] = employment.str.contains('full', regex=False) & employment.str.contains('time', regex=False)
+        
 
-    def load_education_data(self, df):
+        respondents['has_fixed_term'] = self._has_fixed_term(self._column(responses, schema.get('fixedTerm')))
+        
 
-        try:
+        barriers = self._column(responses, schema.get('barriers'))
+        barrier_text = self._as_text(barriers).str.lower()
+        valid_barrier = barriers.notna() & ~barrier_text.str.strip().isin(NO_BARRIER_ANSWERS)
+        respondents['barrier_text'] = barrier_text.where(valid_barrier)
+        
 
-            questions_row = df.iloc[1]
-            undergrad_col = None
-            masters_col = None
-            doctoral_col = None
-            
-            for i, question in enumerate(questions_row):
-                if not isinstance(question, str):
-                    continue
-                
-                question = question.lower()
-                if 'what was the subject area' in question and 'first degree' in str(df.iloc[0][i]).lower():
-                    undergrad_col = i
-                elif 'what was the subject area' in question and 'master' in str(df.iloc[0][i]).lower():
-                    masters_col = i
-                elif 'what subject area' in question and ('doctoral' in str(df.iloc[0][i]).lower() or 'doctorate' in question or 'phd' in question):
-                    doctoral_col = i
-            
+        confidence = self._text_column(responses, schema.get('confidenceLevel'))
+        normalized = confidence.str.lower().map(CONFIDENCE_LEVELS)
+        respondents['confidence'] = normalized.fillna(confidence).where(confidence != '')
+        
+        return respondents
 
-            undergrad_col_index = undergrad_col if undergrad_col is not None else 36
-            masters_col_index = masters_col if masters_col is not None else 42
-            doctoral_col_index = doctoral_col if doctoral_col is not None else 51
-            
+    def _column(self, responses, col_index):
 
-            subject_cols = [undergrad_col_index, masters_col_index, doctoral_col_index]
-            all_subjects = self.extract_unique_subjects(df, subject_cols)
-            
+        if col_index in responses.columns:
+            return responses[col_index]
+        return pd.Series(np.nan, index=responses.index, dtype=object)
 
-            undergraduate_subjects = {}
-            masters_subjects = {}
-            doctoral_subjects = {}
-            
+    def _text_column(self, responses, col_index):
 
-            other_count_ug = 0
-            other_count_ma = 0
-            other_count_doc = 0
+        return self._as_text(self._column(responses, col_index), strip=True)
+
+    def _as_text(self, column, strip=False):
+
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            categories = pd.Series(column.cat.categories, dtype=object).astype(str)
+            if strip:
+                categories = categories.str.strip()
+            values = np.append(categories.to_numpy(dtype=object), '')[column.cat.codes.to_numpy()]
+            return pd.Series(values, index=column.index).astype(str)
             
 
-            for subject in all_subjects:
-                undergraduate_subjects[subject] = 0
-                masters_subjects[subject] = 0
-                doctoral_subjects[subject] = 0
+        text = column.astype(object).where(column.notna(), '').astype(str)
+        return text.str.strip() if strip else text
+
+    def _has_fixed_term(self, fixed_term):
+
+        if pd.api.types.is_numeric_dtype(fixed_term):
+            return fixed_term.fillna(0).astype(float) >= 1
             
 
-            for i in range(4, len(df)):
+        text = self._as_text(fixed_term)
+        is_count = text.str.fullmatch(r'\s*[+-]?\d+\s*')
+        count = pd.to_numeric(text.where(is_count), errors='coerce')
+        
 
-                other_count_ug = self.process_subject_data(
-                    df, i, undergrad_col_index, undergraduate_subjects, 
-                    other_count_ug, all_subjects, undergrad_col_index + 1
-                )
-                
+        lowered = text.str.lower()
+        is_text = fixed_term.notna() & ~is_count & ~lowered.isin(['', 'none', 'no', '0'])
+        first_number = pd.to_numeric(lowered.str.extract(r'(\d+)', expand=False), errors='coerce')
+        
 
-                other_count_ma = self.process_subject_data(
-                    df, i, masters_col_index, masters_subjects, 
-                    other_count_ma, all_subjects, masters_col_index + 1
-                )
-                
+        return (is_count & (count > 0)) | (is_text & (first_number.isna() | (first_number > 0)))
 
-                other_count_doc = self.process_subject_data(
-                    df, i, doctoral_col_index, doctoral_subjects, 
-                    other_count_doc, all_subjects, doctoral_col_index + 1
-                )
-            
+    def load_demographic_data(self, df):
 
-            if other_count_ug > 0:
-                undergraduate_subjects["Other"] = other_count_ug
-            if other_count_ma > 0:
-                masters_subjects["Other"] = other_count_ma
-            if other_count_doc > 0:
-                doctoral_subjects["Other"] = other_count_doc
-            
+        return self.load_topic('demographic', df)
 
-            education_data = {}
-            education_data['undergraduate_subjects'] = [
-                {'name': subject, 'value': count} 
-                for subject, count in sorted(undergraduate_subjects.items())
-                if count > 0
-            ]
-            
-            education_data['masters'] = [
-                {'name': subject, 'value': count} 
-                for subject, count in sorted(masters_subjects.items())
-                if count > 0
-            ]
-            
-            education_data['doctoral'] = [
-                {'name': subject, 'value': count} 
-                for subject, count in sorted(doctoral_subjects.items())
-                if count > 0
-            ]
-            
-            return all_subjects, education_data
-            
-        except Exception as e:
-            print(f"Error processing education data: {e}")
-            return [], {}
-    
-    def load_gender_employment_data(self, df):
+    def accumulate_demographic(self, df):
 
-        try:
+        export = self.get_export(df)
+        col_indices = dict(zip(DEMOGRAPHIC_FIELDS, export.schema.require(*DEMOGRAPHIC_FIELDS)))
+        
 
-            male_total = 0
-            female_total = 0
-            male_fulltime = 0
-            female_fulltime = 0
-            
+        responses = export.responses
+        
 
-            gender_col = 18  
-            employment_col = 84  
-            
- 
-            for i in range(4, len(df)):
-                if gender_col >= len(df.columns) or employment_col >= len(df.columns):
-                    break
-                
+        birth_year = self._int_column(responses[col_indices['birthYear']])
+        birth_year = birth_year.mask((birth_year != 0) & ~birth_year.between(*BIRTH_YEAR_RANGE))
+        
 
-                gender_value = str(df.iloc[i][gender_col]).strip() if pd.notna(df.iloc[i][gender_col]) else ""
-                gender_value = gender_value.lower()
-                
+        children_count = self._int_column(responses[col_indices['childrenCount']]).fillna(0)
+        
 
-                if "female" in gender_value or gender_value == "f":
-                    female_total += 1
-                elif "male" in gender_value or gender_value == "m":
-                    male_total += 1
-                
+        doctoral_year = self._int_column(responses[col_indices['doctoralYear']])
+        doctoral_year = doctoral_year.mask((doctoral_year != 0) & ~doctoral_year.between(*DOCTORAL_YEAR_RANGE))
+        
 
-                employment_value = str(df.iloc[i][employment_col]).strip() if pd.notna(df.iloc[i][employment_col]) else ""
-                employment_value = employment_value.lower()
-                
+        has_children = responses[col_indices['childrenYesNo']].astype(str) == 'Yes'
+        disability = self._text_column(responses, col_indices['disability'])
+        disability = disability.where(responses[col_indices['disability']].notna(), 'No')
+        
 
-                if "full" in employment_value and "time" in employment_value:
+        store = RespondentStore.from_columns({
+            'id': responses.index - (FIRST_RESPONSE_ROW - 1),
+            'birthYear': birth_year,
+            'nationality': self._text_column(responses, col_indices['nationality']),
+            'hasChildren': has_children,
+            'childrenCount': children_count,
+            'maritalStatus': self._text_column(responses, col_indices['maritalStatus']),
+            'disabilityStatus': disability,
+            'doctoralYear': doctoral_year,
+            'confidenceLevel': self._text_column(responses, col_indices['confidenceLevel'])
+        })
+        
 
-                    if "female" in gender_value or gender_value == "f":
-                        female_fulltime += 1
-                    elif "male" in gender_value or gender_value == "m":
-                        male_fulltime += 1
-            
+        accumulator = DemographicAccumulator()
+        response_id_col = export.schema.get('responseId')
+        accumulator.add(store, responses[response_id_col] if response_id_col in responses.columns else None)
+        return accumulator
 
-            male_percentage = (male_fulltime / male_total * 100) if male_total > 0 else 0
-            female_percentage = (female_fulltime / female_total * 100) if female_total > 0 else 0
-            
+    def _int_column(self, column):
 
-            gender_employment_data = {}
-            
+        if pd.api.types.is_numeric_dtype(column):
+            return np.trunc(column.astype(float))
+        text = self._as_text(column)
+        return pd.to_numeric(text.where(text.str.fullmatch(r'\s*[+-]?\d+\s*')), errors='coerce')
 
-            gender_employment_data['fulltime_by_gender'] = [
-                {'name': 'Female', 'value': round(female_percentage, 1)},
-                {'name': 'Male', 'value': round(male_percentage, 1)}
-            ]
-            
+    def get_demographic_chart_data(self, data, data_type):
 
-            gender_employment_data['fulltime_counts'] = {
-                'female_total': female_total,
-                'male_total': male_total,
-                'female_fulltime': female_fulltime,
-                'male_fulltime': male_fulltime
-            }
+        if not isinstance(data, RespondentStore):
+            data = RespondentStore.from_records(data)
+        return data.rollups().chart_data(data_type)
             
+    def extract_unique_subjects(self, df, subject_cols):
 
-            fixed_term_col = 88
-            female_with_fixed_term = 0
-            male_with_fixed_term = 0
-            
+        tokens = self._explode_subjects(df, dict(enumerate(subject_cols)))
+        return sorted(tokens.loc[tokens['subject'] != OTHER_SUBJECT, 'subject'].unique())
 
-            for i in range(4, len(df)):
-                if gender_col >= len(df.columns) or fixed_term_col >= len(df.columns):
-                    break
-                
+    def _explode_subjects(self, df, level_cols):
 
-                gender_value = str(df.iloc[i][gender_col]).strip() if pd.notna(df.iloc[i][gender_col]) else ""
-                gender_value = gender_value.lower()
+        export = self.get_export(df)
+        responses = export.responses
+        frames = []
+        for level, col_index in level_cols.items():
+            if col_index >= export.column_count:
+                continue
                 
 
-                fixed_term_value = df.iloc[i][fixed_term_col]
-                has_fixed_term = False
-                
-                try:
-
-                    fixed_term_count = int(fixed_term_value) if pd.notna(fixed_term_value) else 0
-                    has_fixed_term = fixed_term_count > 0
-                except (ValueError, TypeError):
-
-                    if isinstance(fixed_term_value, str):
-                        fixed_term_text = fixed_term_value.lower()
-
-                        if fixed_term_text and fixed_term_text != "none" and fixed_term_text != "no" and fixed_term_text != "0":
-                            import re
-                            numeric_parts = re.findall(r'\d+', fixed_term_text)
-                            if numeric_parts:
-                                fixed_term_count = int(numeric_parts[0])
-                                has_fixed_term = fixed_term_count > 0
-                            else:
-                                has_fixed_term = True
-
-                if has_fixed_term:
-                    if "female" in gender_value or gender_value == "f":
-                        female_with_fixed_term += 1
-                    elif "male" in gender_value or gender_value == "m":
-                        male_with_fixed_term += 1
+            # Answers repeat a lot, so each distinct one is split once and joined back to its rows by code.
+            codes, answers = pd.factorize(self._column(responses, col_index))
+            answers = pd.Series(answers, dtype=object).astype(str)
+            answered = codes >= 0
+            answered[answered] = (answers != '').to_numpy()[codes[answered]]
+            frames.append(pd.DataFrame({
+                'level': level,
+                'answer': codes[answered],
+                'other_text': self._text_column(responses, export.schema.text_column(col_index))[answered].to_numpy(),
+                'row': np.flatnonzero(answered)
+            }).join(answers.str.split(',').explode().str.strip().rename('subject'), on='answer'))
             
-
-            female_fixed_term_percentage = (female_with_fixed_term / female_total * 100) if female_total > 0 else 0
-            male_fixed_term_percentage = (male_with_fixed_term / male_total * 100) if male_total > 0 else 0
+        if not frames:
+            return pd.DataFrame({'level': [], 'subject': [], 'other_text': [], 'row': []})
             
 
-            gender_employment_data['fixed_term_by_gender'] = [
-                {'name': 'Female', 'value': round(female_fixed_term_percentage, 1)},
-                {'name': 'Male', 'value': round(male_fixed_term_percentage, 1)}
-            ]
-            
+        tokens = pd.concat(frames, ignore_index=True)[['level', 'subject', 'other_text', 'row']]
+        return tokens[tokens['subject'] != '']
 
-            gender_employment_data['fixed_term_counts'] = {
-                'female_with_fixed_term': female_with_fixed_term,
-                'male_with_fixed_term': male_with_fixed_term
-            }
-            
-            return gender_employment_data
-            
-        except Exception as e:
-            print(f"Error processing gender and employment data: {e}")
-            return {}
-    
-    def process_barriers_data(self, df):
+    def get_subject_index(self, all_subjects):
 
-        try:
+        index = self._subject_index
+        if index is None or (index.subjects is not all_subjects and index.subjects != list(all_subjects)):
+            index = self._subject_index = SubjectIndex(list(all_subjects))
+        return index
 
-            barrier_categories = {
-                "Work-life balance": ["work life", "work-life", "balance", "family", "personal life","fixed term"],
-                "Childcare responsibilities": ["child", "children", "parenting", "maternity", "baby", "infant","kids"],
-                "Limited funding": ["fund", "money", "financial", "budget", "grant", "resource","low-payment","funding","poor"],
-                "Lack of mentoring": ["mentor","mentoring", "guidance", "supervision", "support", "advising"],
-                "Gender bias": ["gender", "bias", "discrimination", "sexism", "woman", "female", "equality"],
-                "Heavy workload": ["workload", "overwork", "busy", "time", "burden", "pressure", "stress", "admin"],
-                "Lack of flexibility": ["rigid", "flex", "schedule", "hours", "remote", "accommodat"],
-                "Field competition": ["compet", "crowd", "saturated", "job market", "position", "limited openings","competing"],
-                "Health issues": ["health", "illness", "medical", "mental health", "burnout", "depression", "anxiety"],
-                "Geographic limitations": ["location", "geograph", "mobility", "relocate", "move", "travel"]
-            }
-            
+    def standardize_subject(self, subject, all_subjects):
 
-            barrier_counts = {key: 0 for key in barrier_categories.keys()}
-            total_valid_responses = 0
+        return self.get_subject_index(all_subjects).standardize(subject)
+        
+    def aggregate_subjects(self, df, level_cols):
 
-            gender_col = 18
-            
+        accumulator = SubjectAccumulator(level_cols)
+        accumulator.add(self._explode_subjects(df, level_cols), OTHER_SUBJECT)
+        return accumulator
 
-            barriers_col = 113
-            
-            if barriers_col >= len(df.columns) or gender_col >= len(df.columns):
-                print(f"Error: Column index out of range. The dataset only has {len(df.columns)} columns.")
-                return {}
+    def load_education_data(self, df):
 
-            for i in range(4, len(df)):
+        return self.load_topic('education', df)
 
-                gender_value = str(df.iloc[i][gender_col]).strip().lower() if pd.notna(df.iloc[i][gender_col]) else ""
-                is_female = "female" in gender_value or gender_value == "f"
-                
+    def subject_columns(self, export):
 
-                if not is_female:
-                    continue
+        return {field: export.schema.column(field) for field in SUBJECT_FIELDS if field in export.schema}
 
-                barrier_value = df.iloc[i][barriers_col]
-                
+    def accumulate_education(self, df):
 
-                if pd.isna(barrier_value) or str(barrier_value).strip().lower() in ['', 'n/a', 'none', 'no', 'not applicable']:
-                    continue
-                    
+        return self.aggregate_subjects(df, self.subject_columns(self.get_export(df)))
+    
+    def load_gender_employment_data(self, df):
 
-                total_valid_responses += 1
+        return self.load_topic('gender_employment', df)
 
-                barrier_text = str(barrier_value).lower()
-                
+    def accumulate_gender_employment(self, df):
 
-                matched_category = False
-                for category, keywords in barrier_categories.items():
+        schema = self.get_export(df).schema
+        accumulator = GenderEmploymentAccumulator(
+            has_employment='gender' in schema and 'employment' in schema,
+            has_fixed_term='gender' in schema and 'fixedTerm' in schema
+        )
+        accumulator.add(self.get_respondent_table(df))
+        return accumulator
+    
+    def process_barriers_data(self, df):
 
-                    if any(keyword.lower() in barrier_text for keyword in keywords):
-                        barrier_counts[category] += 1
-                        matched_category = True
-                
+        return self.load_topic('barriers', df)
 
-                if not matched_category:
-                    if "Other" not in barrier_counts:
-                        barrier_counts["Other"] = 0
-                    barrier_counts["Other"] += 1
-            
+    def _require_columns(self, df, *fields):
 
-            if total_valid_responses > 0:
-                barrier_percentages = {
-                    category: (count / total_valid_responses) * 100
-                    for category, count in barrier_counts.items()
-                }
-            else:
-                barrier_percentages = barrier_counts
-            
+        return self.get_export(df).schema.require(*fields)
 
-            barriers_data = {}
-            barriers_data['career_barriers'] = [
-                {'name': name, 'value': round(percentage, 1)} 
-                for name, percentage in sorted(barrier_percentages.items())
-            ]
-            
+    def accumulate_barriers(self, df):
 
-            barriers_data['raw_counts'] = barrier_counts
-            barriers_data['total_valid_responses'] = total_valid_responses
-            
-            print(f"Processed {total_valid_responses} valid responses for female researcher career barriers")
-            
-            return barriers_data
-            
-        except Exception as e:
-            print(f"Error processing barriers data: {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
+        self._require_columns(df, 'barriers', 'gender')
+        respondents = self.get_respondent_table(df)
+        female_barriers = respondents.loc[
+            (respondents['gender'] == 'Female') & respondents['barrier_text'].notna(), 'barrier_text'
+        ]
+        
+
+        accumulator = BarrierAccumulator(self.barrier_classifier)
+        accumulator.add(female_barriers)
+        return accumulator
     
     def process_confidence_data(self, df):
 
-        try:
+        return self.load_topic('confidence', df)
+
+    def accumulate_confidence(self, df):
+
+        self._require_columns(df, 'confidenceLevel', 'gender')
+        accumulator = ConfidenceAccumulator()
+        accumulator.add(self.get_respondent_table(df))
+        return accumulator
+
+    @tracer.traced('build_cross_filter')
+    def build_cross_filter(self, df, topics=TOPICS, demographic=None):
+        """Bitmap indexes over the export's respondents, with each topic's row-level inputs kept for re-counting.
+
+        demographic is the export's demographic accumulator, if the caller already has one; its respondent
+        store already holds the factorized demographic columns, so they are not read a second time.
+        """
+        export = self.get_export(df)
+        respondents = self.get_respondent_table(df)
+        store = None
+        if 'demographic' in topics:
+            accumulator = demographic
+            if accumulator is None:
+                accumulator = self.accumulate_topics(df, ['demographic'])['demographic']
+            store = accumulator.finalize() if accumulator is not None else None
+            
+
+        cross_filter = CrossFilter(len(export))
+        cross_filter.add_dimension('gender', respondents['gender'])
+        if store is not None:
+            for field, year_range in (('birthYear', BIRTH_YEAR_RANGE), ('doctoralYear', DOCTORAL_YEAR_RANGE)):
+                years = pd.Series(store.arrays[field], dtype='Int64')
+                cross_filter.add_dimension(field, years.where(store.arrays[f"{field}Valid"] & years.between(*year_range)))
+            for field in ('maritalStatus', 'disabilityStatus', 'nationality'):
+                values = pd.Series(store.text_values(field), dtype=object)
+                cross_filter.add_dimension(field, values.where(values != ''))
+                
 
-            confidence_col = 114 
-            gender_col = 18      
-            
-            if confidence_col >= len(df.columns) or gender_col >= len(df.columns):
-                print(f"Error: Column index out of range. The dataset only has {len(df.columns)} columns.")
-                return {}
-        except Exception as e:
-            print(f"Error setting up confidence data columns: {e}")
-            return {}
-            
-        try:
+        for topic in topics:
+            try:
+                with tracer.span(f"index_{topic}"):
+                    self._add_filter_source(cross_filter, topic, df, respondents, store)
+            except Exception as e:
+                print(f"{TOPIC_ERRORS[topic]}: {e}")
+        return cross_filter
+
+    def _add_filter_source(self, cross_filter, topic, df, respondents, store):
+
+        if topic == 'demographic' and store is not None:
+            cross_filter.add_topic(topic, DemographicAccumulator(), None, (store,))
             
 
-            female_confidence_count = {}
-            male_confidence_count = {}
+        elif topic == 'education':
+            level_cols = self.subject_columns(self.get_export(df))
+            tokens = self._explode_subjects(df, level_cols)
+            keys = ['level', 'subject', 'other_text']
+            codes = tokens.groupby(keys, sort=False).ngroup().to_numpy().astype(np.int32)
+            groups = list(tokens[keys].drop_duplicates().itertuples(index=False, name=None))
             
 
-            for i in range(4, len(df)):
+            # Tokens are kept as group codes, so a filtered count is a bincount over the matching ones.
+            def add_groups(accumulator, codes):
+                counts = np.bincount(codes, minlength=len(groups))
+                accumulator.add_counts(((groups[code], counts[code]) for code in np.flatnonzero(counts)), OTHER_SUBJECT)
+                
 
-                gender_value = str(df.iloc[i][gender_col]).strip().lower() if pd.notna(df.iloc[i][gender_col]) else ""
-                is_female = "female" in gender_value or gender_value == "f"
-                is_male = "male" in gender_value or gender_value == "m"
+            # Filtered 'Other' answers are standardized against every subject, so one SubjectIndex serves all slices.
+            subjects = sorted(set(subject for level, subject, text in groups if subject != OTHER_SUBJECT))
+            cross_filter.add_topic(topic, SubjectAccumulator(level_cols, subjects), tokens['row'].astype(np.int64),
+                                   (codes,), add=add_groups)
+                                   
+
+        elif topic == 'gender_employment':
+            template = self.accumulate_gender_employment(df).empty()
+            cross_filter.add_topic(topic, template, None, (respondents[['gender', 'fulltime', 'has_fixed_term']],))
+            
+
+        elif topic == 'barriers':
+            # Every gender's answers are indexed; without a gender filter the chart stays on female researchers.
+            self._require_columns(df, 'barriers', 'gender')
+            answered = respondents['barrier_text'].notna().to_numpy()
+            indicators = self.barrier_classifier.classify(respondents['barrier_text'][answered])
+            cross_filter.add_topic(topic, BarrierAccumulator(self.barrier_classifier), np.flatnonzero(answered),
+                                   (indicators,), add=BarrierAccumulator.add_indicators,
+                                   filters={'gender': {'Female'}})
+                                   
+
+        elif topic == 'confidence':
+            self._require_columns(df, 'confidenceLevel', 'gender')
+            confidence = respondents[['gender', 'confidence']].astype({'confidence': 'category'})
+            cross_filter.add_topic(topic, ConfidenceAccumulator(), None, (confidence,))
+
+    def load_topics(self, df):
+
+        return self.finalize_topics(self.accumulate_topics(df))
+
+    def load_topic(self, topic, df):
+
+        return self.finalize_topic(topic, self.accumulate_topics(df, [topic])[topic])
+
+    def accumulate_topics(self, df, topics=TOPICS):
+
+        accumulators = {}
+        for topic in topics:
+            try:
+                with tracer.span(f"accumulate_{topic}"):
+                    accumulators[topic] = getattr(self, f"accumulate_{topic}")(df)
+            except Exception as e:
+                print(f"{TOPIC_ERRORS[topic]}: {e}")
+                accumulators[topic] = None
+        return accumulators
+
+    def response_ids(self, export):
+
+        response_id_col = export.schema.get('responseId')
+        if response_id_col not in export.responses.columns:
+            raise ValueError("The export has no ResponseId column, so responses cannot be matched")
+        response_ids = export.responses[response_id_col]
+        if response_ids.isna().any() or response_ids.duplicated().any():
+            raise ValueError("ResponseId is missing or repeated, so responses cannot be matched")
+        return response_ids.astype(str)
+
+    def diff_exports(self, old, new):
+        """Responses of old that are gone or edited in new, and responses of new that are added or edited"""
+        old_header = old.header.fillna('').astype(str).to_numpy()
+        new_header = new.header.fillna('').astype(str).to_numpy()
+        if old_header.shape != new_header.shape or (old_header != new_header).any():
+            raise ValueError("The export header has changed")
+            
+
+        old_ids = self.response_ids(old)
+        new_ids = self.response_ids(new)
+        columns = [col_index for col_index in new.responses.columns if col_index in old.responses.columns]
+        old_hashes = self._row_hashes(old, columns, old_ids)
+        new_hashes = self._row_hashes(new, columns, new_ids)
+        
 
-                if not (is_female or is_male):
-                    continue
-                    
+        common = old_hashes.index.intersection(new_hashes.index)
+        edited = common[old_hashes[common].to_numpy() != new_hashes[common].to_numpy()]
+        removed = old_hashes.index.difference(new_hashes.index).union(edited)
+        added = new_hashes.index.difference(old_hashes.index).union(edited)
+        
 
-                confidence_value = df.iloc[i][confidence_col]
+        return (old.subset(old.responses[old_ids.isin(removed).to_numpy()]),
+                new.subset(new.responses[new_ids.isin(added).to_numpy()]))
+
+    def _row_hashes(self, export, columns, response_ids):
+
+        # Compacted exports may type the same answers differently, so rows are hashed as text.
+        hashes = pd.util.hash_pandas_object(export.responses[columns].astype('string'), index=False)
+        return pd.Series(hashes.to_numpy(), index=response_ids.to_numpy())
+
+    def update_topics(self, accumulators, old, new):
+        """Bring accumulators built from the old export up to date with the new one, matching responses by ResponseId.
+
+        Only removed, added and edited responses are processed. Returns the number of responses removed and added.
+        """
+        removed, added = self.diff_exports(old, new)
+        for topic, accumulator in accumulators.items():
+            with tracer.span(f"update_{topic}", removed=len(removed), added=len(added)):
+                if accumulator is not None and len(removed) > 0:
+                    accumulator = self._subtract(topic, accumulator, removed)
+                if accumulator is not None and len(added) > 0:
+                    accumulator = self._merge(topic, accumulator, added)
+                if accumulator is None:
+                    accumulator = self.accumulate_topics(new, [topic])[topic]
+                accumulators[topic] = accumulator
                 
 
-                if pd.isna(confidence_value) or str(confidence_value).strip() == '':
-                    continue
-                    
+        if accumulators.get('demographic') is not None:
+            accumulators['demographic'].reorder(self.response_ids(new).to_numpy(),
+                                                new.responses.index - (FIRST_RESPONSE_ROW - 1))
+        return len(removed), len(added)
 
-                confidence_level = str(confidence_value).strip()
-                
+    def _subtract(self, topic, accumulator, export):
 
-                if confidence_level.lower() in ['very confident', 'extremely confident']:
-                    confidence_level = 'Very Confident'
-                elif confidence_level.lower() in ['confident', 'fairly confident', 'quite confident']:
-                    confidence_level = 'Confident'
-                elif confidence_level.lower() in ['somewhat confident', 'moderately confident']:
-                    confidence_level = 'Somewhat Confident'
-                elif confidence_level.lower() in ['not very confident', 'slightly confident', 'a little confident']:
-                    confidence_level = 'Not Very Confident'
-                elif confidence_level.lower() in ['not confident', 'not at all confident']:
-                    confidence_level = 'Not Confident'
-                
+        delta = self.accumulate_topics(export, [topic])[topic]
+        return accumulator.subtract(delta) if delta is not None else None
 
-                if is_female:
-                    female_confidence_count[confidence_level] = female_confidence_count.get(confidence_level, 0) + 1
-                elif is_male:
-                    male_confidence_count[confidence_level] = male_confidence_count.get(confidence_level, 0) + 1
-            
+    def _merge(self, topic, accumulator, export):
 
-            confidence_order = [
-                'Very Confident',
-                'Confident',
-                'Somewhat Confident',
-                'Not Very Confident',
-                'Not Confident'
-            ]
-            
+        delta = self.accumulate_topics(export, [topic])[topic]
+        return accumulator.merge(delta) if delta is not None else None
 
-            female_data = []
-            for level in confidence_order:
-                if level in female_confidence_count and female_confidence_count[level] > 0:
-                    female_data.append({'name': level, 'value': female_confidence_count[level], 'gender': 'Female'})
+    def merge_topics(self, accumulators, others):
+        """Merge one batch's accumulators into the running ones; a topic that failed in any batch stays failed"""
+        if accumulators is None:
+            return others
             
 
-            male_data = []
-            for level in confidence_order:
-                if level in male_confidence_count and male_confidence_count[level] > 0:
-                    male_data.append({'name': level, 'value': male_confidence_count[level], 'gender': 'Male'})
-            
+        for topic, other in others.items():
+            accumulators[topic] = accumulators[topic].merge(other) if other is not None else None
+        return accumulators
 
-            for level, count in female_confidence_count.items():
-                if level not in confidence_order and count > 0:
-                    female_data.append({'name': level, 'value': count, 'gender': 'Female'})
-                    
-            for level, count in male_confidence_count.items():
-                if level not in confidence_order and count > 0:
-                    male_data.append({'name': level, 'value': count, 'gender': 'Male'})
+    def finalize_topics(self, accumulators):
+
+        return {topic: self.finalize_topic(topic, accumulator) for topic, accumulator in accumulators.items()}
+
+    def finalize_topic(self, topic, accumulator):
+
+        with tracer.span(f"finalize_{topic}"):
+            return self._finalize_topic(topic, accumulator)
+
+    def _finalize_topic(self, topic, accumulator):
+
+        if accumulator is None:
+            return TOPIC_DEFAULTS[topic]()
             
 
-            confidence_data = {'confidenceLevel': female_data + male_data}
+        if topic == 'education':
+            return accumulator.finalize(self.get_subject_index)
             
 
+        result = accumulator.finalize()
+        if topic == 'barriers':
+            print(f"Processed {result['total_valid_responses']} valid responses for female researcher career barriers")
+        elif topic == 'confidence':
+            genders = Counter(item['gender'] for item in result['confidenceLevel'])
             print(f"Processed confidence data from column 115 by gender")
-            print(f"Female confidence data: {len(female_data)} categories")
-            print(f"Male confidence data: {len(male_data)} categories")
-            
-            return confidence_data
-            
-        except Exception as e:
-            print(f"Error processing confidence data: {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
\ No newline at end of file
+            print(f"Female confidence data: {genders['Female']} categories")
+            print(f"Male confidence data: {genders['Male']} categories")
+        return result
+
+
+def accumulate_cached_topic(cache_dir, cache_key, topic, columns=None):
+    """Process-pool entry point: accumulate one topic from a dataset cache entry, leaving finalize to the caller"""
+    export = DatasetCache(cache_dir).load(cache_key, columns)
+    if export is None:
+        raise RuntimeError(f"Dataset cache entry {cache_key} is missing")
+    return topic, DataLoader().accumulate_topics(export, [topic])[topic]
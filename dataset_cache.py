@@ -0,0 +1,185 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from survey_export import SurveyExport
+from survey_schema import SurveySchema
+
+CACHE_FORMAT = 5
+ALIGNMENT = 8
+SEPARATOR = '\x00'
+
+class DatasetCache:
+    """On-disk columnar copy of parsed survey exports, keyed by file content"""
+
+    def __init__(self, cache_dir):
+
+        self.cache_dir = cache_dir
+
+    def key_for(self, csv_file):
+
+        stat = os.stat(csv_file)
+        digest = hashlib.sha256()
+        with open(csv_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+
+        return f"{digest.hexdigest()[:32]}-{stat.st_size}-{stat.st_mtime_ns}"
+
+    def load(self, key, columns=None):
+        """Read a cache entry, or None; columns limits which response columns are materialized"""
+
+        entry = os.path.join(self.cache_dir, key)
+        meta_file = os.path.join(entry, 'meta.json')
+        if not os.path.exists(meta_file):
+            return None
+
+
+        try:
+            with open(meta_file) as f:
+                meta = json.load(f)
+            if meta['format'] != CACHE_FORMAT:
+                return None
+
+            header = self._read_frame(entry, 'header', meta['frames']['header'])
+            responses = self._read_frame(entry, 'responses', meta['frames']['responses'], columns)
+            return SurveyExport(header, responses, meta['column_count'], SurveySchema.from_dict(meta['schema']))
+        except Exception as e:
+            print(f"Ignoring unreadable dataset cache {entry}: {e}")
+            return None
+
+    def store(self, key, csv_file, export):
+
+        entry = os.path.join(self.cache_dir, key)
+        staging = f"{entry}.tmp{os.getpid()}"
+
+
+        try:
+            os.makedirs(staging, exist_ok=True)
+            frames = {
+                'header': self._write_frame(staging, 'header', export.header),
+                'responses': self._write_frame(staging, 'responses', export.responses)
+            }
+
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump({'format': CACHE_FORMAT, 'source': os.path.abspath(csv_file),
+                           'column_count': export.column_count, 'schema': export.schema.to_dict(),
+                           'frames': frames}, f)
+
+            if os.path.exists(entry):
+                shutil.rmtree(entry)
+            os.replace(staging, entry)
+        except Exception as e:
+            print(f"Could not write dataset cache for {csv_file}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+
+
+        self._prune(os.path.abspath(csv_file), key)
+        return True
+
+    def _write_frame(self, entry, frame_name, frame):
+
+        blob = bytearray()
+        columns = [self._write_column(blob, name, frame[name]) for name in frame.columns]
+        if isinstance(frame.index, pd.RangeIndex):
+            index = {'start': frame.index.start, 'stop': frame.index.stop}
+        else:
+            index = self._append(blob, frame.index.to_numpy(dtype=np.int64))
+
+
+        with open(os.path.join(entry, f"{frame_name}.bin"), 'wb') as f:
+            f.write(blob)
+        return {'index': index, 'columns': columns}
+
+    def _read_frame(self, entry, frame_name, frame, names=None):
+
+        path = os.path.join(entry, f"{frame_name}.bin")
+        # One copy-on-write mapping per frame; every column below is a view into it
+        blob = np.memmap(path, dtype=np.uint8, mode='c') if os.path.getsize(path) else np.empty(0, dtype=np.uint8)
+        index = frame['index']
+        if 'start' in index:
+            index = pd.RangeIndex(index['start'], index['stop'])
+        else:
+            index = pd.Index(self._segment(blob, index))
+
+
+        values = {}
+        for column in frame['columns']:
+            if names is None or column['name'] in names:
+                values[column['name']] = self._read_column(blob, column)
+        return pd.DataFrame(values, index=index, copy=False)
+
+    def _write_column(self, blob, name, column):
+
+        dtype = column.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            return {'name': name, 'kind': 'category',
+                    'categories': self._append_text(blob, pd.Series(dtype.categories, dtype=object)),
+                    'codes': self._append(blob, column.cat.codes.to_numpy())}
+        missing = self._append(blob, column.isna().to_numpy())
+        if pd.api.types.is_integer_dtype(dtype):
+            return {'name': name, 'kind': 'int', 'dtype': str(dtype), 'missing': missing,
+                    'values': self._append(blob, column.fillna(0).to_numpy(dtype=dtype.numpy_dtype))}
+
+
+        return {'name': name, 'kind': 'text', 'dtype': str(dtype), 'missing': missing,
+                'text': self._append_text(blob, column.where(column.notna(), ''))}
+
+    def _read_column(self, blob, column):
+
+        if column['kind'] == 'category':
+            categories = self._read_text(blob, column['categories'])
+            return pd.Categorical.from_codes(self._segment(blob, column['codes']), categories=categories)
+        missing = self._segment(blob, column['missing'])
+        if column['kind'] == 'int':
+            return pd.arrays.IntegerArray(self._segment(blob, column['values']), missing)
+
+
+        values = np.array(self._read_text(blob, column['text']), dtype=object)
+        values[missing] = np.nan
+        return pd.array(values, dtype=column['dtype'])
+
+    def _append(self, blob, array):
+
+        # Pad so every segment can be viewed in place with its own alignment
+        blob.extend(b'\0' * (-len(blob) % ALIGNMENT))
+        segment = {'offset': len(blob), 'dtype': array.dtype.str, 'count': len(array)}
+        blob.extend(array.tobytes())
+        return segment
+
+    def _segment(self, blob, segment):
+
+        dtype = np.dtype(segment['dtype'])
+        end = segment['offset'] + dtype.itemsize * segment['count']
+        return np.asarray(blob[segment['offset']:end]).view(dtype)
+
+    def _append_text(self, blob, values):
+
+        text = values.astype(str)
+        if text.str.contains(SEPARATOR, regex=False).any():
+            raise ValueError("text contains NUL characters")
+        segment = self._append(blob, np.frombuffer(SEPARATOR.join(text.tolist()).encode('utf-8'), dtype=np.uint8))
+        segment['strings'] = len(text)
+        return segment
+
+    def _read_text(self, blob, segment):
+
+        return str(self._segment(blob, segment), 'utf-8').split(SEPARATOR) if segment['strings'] else []
+
+    def _prune(self, source, keep_key):
+
+        for key in os.listdir(self.cache_dir):
+            if key == keep_key or '.tmp' in key:
+                continue
+
+            try:
+                with open(os.path.join(self.cache_dir, key, 'meta.json')) as f:
+                    stale = json.load(f).get('source') == source
+            except (OSError, ValueError):
+                stale = True
+
+            if stale:
+                shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
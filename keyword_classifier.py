@@ -0,0 +1,57 @@
+import re
+import numpy as np
+import pandas as pd
+
+class KeywordClassifier:
+    """Labels free-text answers with every category whose keywords appear in them"""
+
+    def __init__(self, categories):
+
+        self.categories = list(categories.keys())
+
+
+        keyword_categories = {}
+        for index, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword.lower(), set()).add(index)
+
+
+        self.always_matched = sorted(keyword_categories.pop('', set()))
+
+
+        # The alternation is tried longest-first inside a lookahead, so at each
+        # position it reports the longest keyword found there. Any other keyword
+        # starting at that position is a prefix of it, so its categories are
+        # folded into the longest keyword's entry here.
+        self.keyword_categories = {}
+        for keyword in keyword_categories:
+            matched = set()
+            for other, indices in keyword_categories.items():
+                if keyword.startswith(other):
+                    matched |= indices
+            self.keyword_categories[keyword] = sorted(matched)
+
+
+        keywords = sorted(self.keyword_categories, key=len, reverse=True)
+        alternation = '|'.join(re.escape(keyword) for keyword in keywords)
+        self.pattern = re.compile(f"(?=({alternation}))") if keywords else None
+
+    def classify(self, texts):
+
+        indicators = np.zeros((len(texts), len(self.categories)), dtype=bool)
+        indicators[:, self.always_matched] = True
+
+
+        if self.pattern is not None and len(texts) > 0:
+            # Each distinct answer is searched once and its categories copied to every row giving it.
+            codes, answers = pd.factorize(texts, use_na_sentinel=False)
+            matches = pd.Series(answers, dtype=object).astype(str).str.lower().str.findall(self.pattern)
+            matches = pd.Series(matches.to_numpy(), index=np.arange(len(answers))).explode().dropna()
+
+
+            matched_categories = matches.map(self.keyword_categories).explode()
+            answer_indicators = np.zeros((len(answers), len(self.categories)), dtype=bool)
+            answer_indicators[matched_categories.index.to_numpy(), matched_categories.to_numpy(dtype=int)] = True
+            indicators |= answer_indicators[codes]
+
+        return pd.DataFrame(indicators, index=texts.index, columns=self.categories)
@@ -1,6 +1,26 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import subprocess
 import tkinter as tk
 import logging
 from controller import ResearcherController
+from tracing import tracer
+
+STARTED_AT = time.perf_counter()
+
+# Heavy modules in the order the app pulls them in; each one is timed on top of those before it.
+STARTUP_MODULES = [
+    'numpy',
+    'pandas',
+    'matplotlib',
+    'matplotlib.figure',
+    'matplotlib.backends.backend_tkagg',
+    'data_loader',
+    'data_visualizer'
+]
 
 def setup_logging():
 
@@ -14,17 +34,78 @@ def setup_logging():
     )
     return logging.getLogger('main')
 
+def report_import_times(logger, modules=STARTUP_MODULES):
+    """Log how long each heavy module adds to a cold start, measured with -X importtime in a fresh interpreter"""
+    try:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError as e:
+        logger.error(f"Could not time imports: {e}")
+        return
+        
+
+    # Each line is "import time: self [us] | cumulative [us] | package"; a package pulled in by an earlier
+    # one is indented under it, so only unindented lines are costs on top of the modules before.
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit() and not parts[2][1:].startswith(' '):
+            cumulative.setdefault(parts[2].strip(), int(parts[1]))
+            
+
+    total = 0.0
+    for name in modules:
+        if name not in cumulative:
+            logger.info(f"import {name:<36} already loaded")
+            continue
+            
+        elapsed = cumulative[name] / 1e6
+        total += elapsed
+        logger.info(f"import {name:<36} {elapsed * 1000:8.1f} ms")
+        
+    logger.info(f"import total {total * 1000:38.1f} ms")
+
+def parse_args():
+
+    parser = argparse.ArgumentParser(description="Researcher Survey Visualization")
+    parser.add_argument('csv_files', nargs='*', default=["data.csv"],
+                        help="Qualtrics CSV export to visualize; give several to compare or pool survey waves")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream the export in chunks of this many rows to bound memory use")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Always parse the CSV instead of reusing the cached copy of an unchanged export")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Process the survey topics in parallel across this many worker processes")
+    parser.add_argument('--no-prefetch', action='store_true',
+                        help="Only process a topic when it is first selected instead of preparing all topics in the background")
+    parser.add_argument('--watch', action='store_true',
+                        help="Reload the export whenever the CSV file is replaced, reprocessing only the changed responses")
+    parser.add_argument('--import-report', action='store_true',
+                        help="Log the import cost of each heavy module and the time until the window is shown")
+    parser.add_argument('--trace', metavar='FILE', default=None,
+                        help="Record timing and allocation spans for loading and rendering, written as JSON on exit")
+    return parser.parse_args()
+
 def main():
 
+    args = parse_args()
     logger = setup_logging()
+    if args.trace:
+        tracer.enable()
     
     try:
 
         root = tk.Tk()
+        csv_file = args.csv_files[0] if len(args.csv_files) == 1 else args.csv_files
+        app = ResearcherController(root, csv_file, chunksize=args.chunksize, use_cache=not args.no_cache,
+                                   workers=args.workers, prefetch=not args.no_prefetch, watch=args.watch)
         
 
-        app = ResearcherController(root, "data.csv")
-        
+        if args.import_report:
+            root.update_idletasks()
+            logger.info(f"Window shown after {(time.perf_counter() - STARTED_AT) * 1000:.1f} ms")
+            threading.Thread(target=report_import_times, args=(logger,), daemon=True).start()
+            
 
         root.mainloop()
         
@@ -32,6 +113,11 @@ def main():
         logger.error(f"Unhandled exception: {str(e)}", exc_info=True)
 
         print(f"Fatal error: {str(e)}")
+        
+    finally:
+        if args.trace:
+            tracer.disable()
+            logger.info(f"Trace written to {tracer.export_json(args.trace)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
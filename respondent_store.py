@@ -0,0 +1,312 @@
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+
+BIRTH_YEAR_RANGE = (1900, 2025)
+DOCTORAL_YEAR_RANGE = (1950, 2025)
+
+DISABILITY_ORDER = ['Yes', 'Unsure', 'No']
+
+# Children counts up to this are tallied with bincount; a stray larger answer falls back to sorting.
+MAX_COUNTED_CHILDREN = 1000
+
+INT_FIELDS = ['id', 'childrenCount']
+OPTIONAL_INT_FIELDS = ['birthYear', 'doctoralYear']
+BOOL_FIELDS = ['hasChildren']
+TEXT_FIELDS = ['nationality', 'maritalStatus', 'disabilityStatus', 'confidenceLevel']
+
+FIELDS = ['id', 'birthYear', 'nationality', 'hasChildren', 'childrenCount',
+          'maritalStatus', 'disabilityStatus', 'doctoralYear', 'confidenceLevel']
+
+def _smallest_int(values):
+
+    values = np.asarray(values, dtype=np.int64)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if values.size == 0 or (info.min <= values.min() and values.max() <= info.max):
+            return values.astype(dtype)
+    return values
+
+
+class RespondentRecord(Mapping):
+    """Read-only dict-style view of one respondent in a RespondentStore"""
+
+    def __init__(self, store, position):
+
+        self.store = store
+        self.position = position
+
+    def __getitem__(self, field):
+
+        return self.store.value(field, self.position)
+
+    def __iter__(self):
+
+        return iter(FIELDS)
+
+    def __len__(self):
+
+        return len(FIELDS)
+
+    def __repr__(self):
+
+        return repr(dict(self))
+
+
+class RespondentStore:
+    """Struct-of-arrays store of demographic answers, one NumPy array per field"""
+
+    def __init__(self, arrays=None, categories=None):
+
+        if arrays is None:
+            arrays = {field: np.zeros(0, dtype=np.int8) for field in FIELDS}
+            arrays.update({f"{field}Valid": np.zeros(0, dtype=bool) for field in OPTIONAL_INT_FIELDS})
+            arrays.update({field: np.zeros(0, dtype=bool) for field in BOOL_FIELDS})
+            categories = {field: np.array([], dtype=object) for field in TEXT_FIELDS}
+
+        self.arrays = arrays
+        self.categories = categories
+        self._rollups = None
+        self._rollup_bins = None
+
+    @classmethod
+    def from_columns(cls, columns):
+
+        arrays = {}
+        categories = {}
+        for field in INT_FIELDS:
+            arrays[field] = _smallest_int(columns[field])
+
+        for field in OPTIONAL_INT_FIELDS:
+            values = pd.Series(columns[field], dtype=float)
+            arrays[f"{field}Valid"] = values.notna().to_numpy()
+            arrays[field] = _smallest_int(values.fillna(0).to_numpy())
+
+        for field in BOOL_FIELDS:
+            arrays[field] = np.asarray(columns[field], dtype=bool)
+
+        for field in TEXT_FIELDS:
+            codes, uniques = pd.factorize(pd.Series(columns[field], dtype=object))
+            arrays[field] = _smallest_int(codes)
+            categories[field] = np.asarray(uniques, dtype=object)
+
+        return cls(arrays, categories)
+
+    @classmethod
+    def from_records(cls, records):
+
+        columns = {field: [record[field] for record in records] for field in FIELDS}
+        columns.update({field: [np.nan if value is None else value for value in columns[field]]
+                        for field in OPTIONAL_INT_FIELDS})
+        return cls.from_columns(columns)
+
+    @classmethod
+    def concat(cls, stores):
+
+        stores = [store for store in stores if len(store) > 0]
+        if not stores:
+            return cls()
+        if len(stores) == 1:
+            return stores[0]
+
+
+        arrays = {}
+        categories = {}
+        for field in INT_FIELDS + OPTIONAL_INT_FIELDS:
+            arrays[field] = _smallest_int(np.concatenate([store.arrays[field] for store in stores]))
+
+        for field in [f"{field}Valid" for field in OPTIONAL_INT_FIELDS] + BOOL_FIELDS:
+            arrays[field] = np.concatenate([store.arrays[field] for store in stores])
+
+        for field in TEXT_FIELDS:
+            merged = {}
+            codes = []
+            for store in stores:
+                remap = np.array([merged.setdefault(value, len(merged)) for value in store.categories[field]],
+                                 dtype=np.int64)
+                codes.append(remap[store.arrays[field]] if len(remap) else store.arrays[field].astype(np.int64))
+            arrays[field] = _smallest_int(np.concatenate(codes))
+            categories[field] = np.array(list(merged), dtype=object)
+
+        return cls(arrays, categories)
+
+    def take(self, positions, ids=None):
+        """Store of the respondents at these positions, in that order, with text categories renumbered by first appearance"""
+        arrays = {field: array[positions] for field, array in self.arrays.items()}
+        categories = {}
+        for field in TEXT_FIELDS:
+            codes, uniques = pd.factorize(arrays[field])
+            arrays[field] = _smallest_int(codes)
+            categories[field] = self.categories[field][uniques]
+            
+
+        if ids is not None:
+            arrays['id'] = _smallest_int(ids)
+        return RespondentStore(arrays, categories)
+
+    def __len__(self):
+
+        return len(self.arrays['id'])
+
+    def __getitem__(self, position):
+
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("respondent index out of range")
+        return RespondentRecord(self, position)
+
+    def __iter__(self):
+
+        for position in range(len(self)):
+            yield RespondentRecord(self, position)
+
+    def value(self, field, position):
+
+        if field in TEXT_FIELDS:
+            return self.categories[field][self.arrays[field][position]]
+        if field in OPTIONAL_INT_FIELDS:
+            return int(self.arrays[field][position]) if self.arrays[f"{field}Valid"][position] else None
+        if field in BOOL_FIELDS:
+            return bool(self.arrays[field][position])
+        if field in INT_FIELDS:
+            return int(self.arrays[field][position])
+        raise KeyError(field)
+
+    def valid_values(self, field):
+
+        if field in OPTIONAL_INT_FIELDS:
+            return self.arrays[field][self.arrays[f"{field}Valid"]]
+        return self.arrays[field]
+
+    def text_values(self, field):
+
+        return self.categories[field][self.arrays[field]]
+
+    def rollups(self):
+
+        if self._rollups is None:
+            self._rollups = DemographicRollups(self)
+        return self._rollups
+
+    def rollup_bins(self):
+
+        if self._rollup_bins is None:
+            self._rollup_bins = DemographicRollups.bins(self)
+        return self._rollup_bins
+
+    def to_records(self):
+
+        return [dict(record) for record in self]
+
+    def nbytes(self):
+
+        arrays = sum(array.nbytes for array in self.arrays.values())
+        return arrays + sum(sum(len(text) for text in values) for values in self.categories.values())
+
+
+class RespondentSelection:
+    """The respondents of a store picked out by a boolean mask, counted in place instead of copied"""
+
+    def __init__(self, store, keep):
+
+        self.store = store
+        self.keep = keep
+        self.size = int(np.count_nonzero(keep))
+        self._rollups = None
+
+    def __len__(self):
+
+        return self.size
+
+    def rollups(self):
+
+        if self._rollups is None:
+            self._rollups = DemographicRollups(self.store, self.keep)
+        return self._rollups
+
+
+class DemographicRollups:
+    """Per-field histograms of a RespondentStore, computed once so chart requests only walk the categories.
+
+    With keep, only the respondents where the mask is set are counted.
+    """
+
+    def __init__(self, store, keep=None):
+
+        # Every count is a bincount of per-respondent bin codes, so a mask costs one gather per field.
+        bins = store.rollup_bins()
+        positions = np.flatnonzero(keep) if keep is not None else None
+        if bins['children'] is not None:
+            counts = self._counts(bins['children'], positions, length=1)
+            counts[0] = 0
+            values = np.flatnonzero(counts)
+            self.children = (values, counts[values])
+        else:
+            arrays = store.arrays
+            counted = arrays['hasChildren'] & (arrays['childrenCount'] > 0)
+            self.children = np.unique(arrays['childrenCount'][counted if keep is None else counted & keep],
+                                      return_counts=True)
+        self.birth_years = self._counts(bins['birthYear'], positions, BIRTH_YEAR_RANGE)
+        self.doctoral_years = self._counts(bins['doctoralYear'], positions, DOCTORAL_YEAR_RANGE)
+
+
+        statuses = store.categories['maritalStatus']
+        counts = self._counts(bins['maritalStatus'], positions, length=len(statuses))
+        self.marital_status = [(status, int(count)) for status, count in zip(statuses, counts) if status and count > 0]
+
+
+        self.disability = {'Yes': 0, 'No': 0, 'Unsure': 0}
+        statuses = store.categories['disabilityStatus']
+        for status, count in zip(statuses, self._counts(bins['disabilityStatus'], positions, length=len(statuses))):
+            if status not in self.disability:
+                status = 'No'
+            self.disability[status] += int(count)
+
+    @classmethod
+    def bins(cls, store):
+        """Histogram bin of each respondent per field; years outside the chart range fall in one extra bin"""
+        arrays = store.arrays
+        bins = {'maritalStatus': arrays['maritalStatus'], 'disabilityStatus': arrays['disabilityStatus']}
+        children = np.where(arrays['hasChildren'] & (arrays['childrenCount'] > 0), arrays['childrenCount'], 0)
+        bins['children'] = children if not len(children) or children.max() <= MAX_COUNTED_CHILDREN else None
+        for field, (first, last) in (('birthYear', BIRTH_YEAR_RANGE), ('doctoralYear', DOCTORAL_YEAR_RANGE)):
+            years = arrays[field].astype(np.int32)
+            charted = arrays[f"{field}Valid"] & (years >= first) & (years <= last)
+            bins[field] = np.where(charted, years - first, last - first + 1).astype(np.int16)
+        return bins
+
+    def _counts(self, bins, positions, year_range=None, length=0):
+
+        if positions is not None:
+            bins = bins.take(positions)
+        if year_range is None:
+            return np.bincount(bins, minlength=length)
+        span = year_range[1] - year_range[0] + 1
+        return np.bincount(bins, minlength=span + 1)[:span]
+
+    def chart_data(self, data_type):
+
+        if data_type == 'children':
+            values, counts = self.children
+            return [{'name': f"{int(value)}", 'value': int(count)} for value, count in zip(values, counts)]
+
+        elif data_type == 'birthYear':
+            return self._year_chart_data(self.birth_years, BIRTH_YEAR_RANGE)
+
+        elif data_type == 'maritalStatus':
+            return [{'name': name, 'value': value} for name, value in self.marital_status]
+
+        elif data_type == 'disability':
+            return [{'name': category, 'value': self.disability[category]}
+                    for category in DISABILITY_ORDER if self.disability[category] > 0]
+
+        elif data_type == 'doctoralYear':
+            return self._year_chart_data(self.doctoral_years, DOCTORAL_YEAR_RANGE)
+
+        return []
+
+    def _year_chart_data(self, histogram, year_range):
+
+        years = np.flatnonzero(histogram)
+        return [{'name': str(int(year) + year_range[0]), 'value': int(histogram[year])} for year in years]
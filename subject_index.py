@@ -0,0 +1,49 @@
+from functools import lru_cache
+
+class SubjectIndex:
+    """Lookup tables that map free-text subjects onto the standard subject list"""
+
+    def __init__(self, all_subjects, cache_size=4096):
+
+        self.subjects = all_subjects
+        self.exact = set(all_subjects)
+
+
+        self.lowercase = {}
+        for position, subject in enumerate(all_subjects):
+            self.lowercase.setdefault(subject.lower(), position)
+
+
+        self.substrings = {'': 0} if all_subjects else {}
+        for position, subject in enumerate(all_subjects):
+            subject = subject.lower()
+            for start in range(len(subject)):
+                for end in range(start + 1, len(subject) + 1):
+                    self.substrings.setdefault(subject[start:end], position)
+
+        self.lengths = sorted(set(len(subject) for subject in self.lowercase))
+
+
+        self.standardize = lru_cache(maxsize=cache_size)(self._standardize)
+
+    def _standardize(self, subject):
+
+        subject = subject.strip()
+        if subject in self.exact:
+            return subject
+
+
+        subject = subject.lower()
+        if subject in self.lowercase:
+            return self.subjects[self.lowercase[subject]]
+
+
+        # Earliest standard subject that contains the text or is contained in it.
+        position = self.substrings.get(subject, len(self.subjects))
+        for length in self.lengths:
+            for start in range(len(subject) - length + 1):
+                position = min(position, self.lowercase.get(subject[start:start + length], position))
+
+        if position < len(self.subjects):
+            return self.subjects[position]
+        return "Other"
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from survey_schema import SurveySchema
+
+FIRST_RESPONSE_ROW = 4
+
+CATEGORY_RATIO = 0.5
+
+INTEGER_DTYPES = [('Int8', np.int8), ('Int16', np.int16), ('Int32', np.int32)]
+
+class SurveyExport:
+    """A Qualtrics export split into its header rows and typed response rows"""
+
+    def __init__(self, header, responses, column_count=None, schema=None):
+
+        self.header = header
+        self.responses = responses
+        self.column_count = column_count if column_count is not None else len(header.columns)
+        self._schema = schema
+
+    @property
+    def schema(self):
+
+        if self._schema is None:
+            self._schema = SurveySchema.from_header(self.header)
+        return self._schema
+
+    def subset(self, responses):
+        """The same export restricted to some of its responses"""
+        return SurveyExport(self.header, responses, self.column_count, self._schema)
+
+    @classmethod
+    def from_frame(cls, df):
+
+        return cls(df.iloc[:FIRST_RESPONSE_ROW], df.iloc[FIRST_RESPONSE_ROW:])
+
+    def __len__(self):
+
+        return len(self.responses)
+
+    def compact(self):
+
+        plan = plan_dtypes(self.responses)
+        self.responses = apply_dtype_plan(self.responses, plan)
+        return plan
+
+    def memory_usage(self):
+
+        return int(self.header.memory_usage(deep=True).sum() + self.responses.memory_usage(deep=True).sum())
+
+
+def plan_dtypes(responses):
+
+    plan = {}
+    for name in responses.columns:
+        values = responses[name].dropna()
+        if values.empty or isinstance(values.dtype, pd.CategoricalDtype):
+            continue
+        if not (pd.api.types.is_object_dtype(values.dtype) or pd.api.types.is_string_dtype(values.dtype)):
+            continue
+
+
+        text = values.astype(str)
+        if text.str.fullmatch(r'-?(0|[1-9]\d*)').all() and text.str.len().max() <= 9:
+            numbers = text.astype(np.int64)
+            for dtype, limits in INTEGER_DTYPES:
+                info = np.iinfo(limits)
+                if info.min <= numbers.min() and numbers.max() <= info.max:
+                    plan[name] = dtype
+                    break
+        elif text.nunique() <= len(text) * CATEGORY_RATIO:
+            plan[name] = 'category'
+
+    return plan
+
+
+def apply_dtype_plan(responses, plan):
+
+    columns = {}
+    for name in responses.columns:
+        column = responses[name]
+        dtype = plan.get(name)
+        if dtype == 'category':
+            column = column.astype('category')
+        elif dtype is not None:
+            column = pd.to_numeric(column).astype(dtype)
+        columns[name] = column
+
+    return pd.DataFrame(columns, index=responses.index)
@@ -0,0 +1,135 @@
+import re
+import json
+
+# field: (Qualtrics question code, words every version of the question text contains)
+QUESTIONS = {
+    'responseId': ('ResponseId', 'response id'),
+    'gender': ('QA', 'what is your gender'),
+    'birthYear': ('Q1', 'year were you born'),
+    'nationality': ('Q2', 'nationality'),
+    'disability': ('Q5', 'disability'),
+    'childrenYesNo': ('Q6', 'do you have children'),
+    'childrenCount': ('Q6B', 'how many children'),
+    'maritalStatus': ('Q7', 'marital status'),
+    'undergraduate_subjects': ('Q13', 'what was the subject area'),
+    'masters': ('Q15C', 'what was the subject area'),
+    'doctoral': ('Q18', 'what subject area'),
+    'doctoralYear': ('Q22', 'year did you begin your doctorate'),
+    'employment': ('Q36', 'main employment or role'),
+    'fixedTerm': ('Q38', 'fixed term contracts'),
+    'barriers': ('Q57', 'biggest barrier to achieving'),
+    'confidenceLevel': ('Q58', 'confident are you that you will achieve')
+}
+
+def normalize_question(text):
+
+    return ' '.join(text.lower().split()) if isinstance(text, str) else ''
+
+
+class SurveySchema:
+    """Column positions of the survey's questions, resolved once from an export's three header rows.
+
+    A question is found by its code, or by its wording when exactly one column matches and the code is
+    gone. A column whose code no longer asks the same question is not used. Anything that cannot be found
+    is left out and listed in problems, so it is never read from the wrong column.
+    """
+
+    def __init__(self, columns, keys, problems, text_columns=None):
+
+        self.columns = columns
+        self.keys = keys
+        self.problems = problems
+        self.text_columns = text_columns or {}
+        self.positions = {}
+        for position, key in enumerate(keys):
+            if key is not None:
+                self.positions.setdefault(key, position)
+
+    @classmethod
+    def from_header(cls, header):
+
+        codes_row, questions_row, import_ids_row = (header.iloc[row] for row in range(3))
+        codes = {}
+        for position, code in codes_row.items():
+            if isinstance(code, str):
+                codes.setdefault(code, position)
+        questions = {position: normalize_question(question) for position, question in questions_row.items()}
+
+
+        columns = {}
+        problems = []
+        for field, (code, words) in QUESTIONS.items():
+            position = codes.get(code)
+            if position is not None:
+                if words in questions[position]:
+                    columns[field] = int(position)
+                else:
+                    problems.append(f"column {position} ({code}) no longer asks about '{words}'")
+                continue
+
+
+            matches = [position for position, question in questions.items() if words in question]
+            if len(matches) == 1:
+                problems.append(f"question {code} found by its wording in column {matches[0]}")
+                columns[field] = int(matches[0])
+            else:
+                problems.append(f"question {code} ('{words}') is not in this export")
+
+
+        # A choice with a text box, such as "Other (please specify)", exports its text as <code>_<choice>_TEXT.
+        text_columns = {}
+        for code, position in codes.items():
+            match = re.fullmatch(r'(.+)_\d+_TEXT', code)
+            if match and match.group(1) in codes:
+                text_columns.setdefault(int(codes[match.group(1)]), int(position))
+
+
+        keys = [cls.question_key(code, import_id) for code, import_id in zip(codes_row, import_ids_row)]
+        return cls(columns, keys, problems, text_columns)
+
+    @classmethod
+    def question_key(cls, code, import_id):
+        """The question's ImportId, which survives reordering and renaming; the question code if there is none"""
+        if isinstance(import_id, str):
+            try:
+                return json.loads(import_id)['ImportId']
+            except (ValueError, TypeError, KeyError):
+                pass
+        return code if isinstance(code, str) else None
+
+    @classmethod
+    def from_dict(cls, values):
+
+        text_columns = {int(position): text_position for position, text_position in values['text_columns'].items()}
+        return cls(values['columns'], values['keys'], values['problems'], text_columns)
+
+    def to_dict(self):
+
+        return {'columns': self.columns, 'keys': self.keys, 'problems': self.problems, 'text_columns': self.text_columns}
+
+    def __contains__(self, field):
+
+        return field in self.columns
+
+    def get(self, field, default=None):
+
+        return self.columns.get(field, default)
+
+    def column(self, field):
+
+        if field not in self.columns:
+            code, words = QUESTIONS[field]
+            raise LookupError(f"Question {code} ('{words}') is not in this export")
+        return self.columns[field]
+
+    def require(self, *fields):
+
+        return [self.column(field) for field in fields]
+
+    def text_column(self, position):
+        """Column with the text typed into the question's "Other" box, if it has one"""
+        return self.text_columns.get(position)
+
+    def position(self, key):
+        """Column of the question with this ImportId or code, if the export has it"""
+        return self.positions.get(key)
@@ -0,0 +1,48 @@
+import os
+from survey_schema import SurveySchema
+
+POOLED_WAVE = "All waves"
+
+class SurveyWaves:
+    """Several exports of the same survey, with each wave's columns mapped onto the first wave's layout"""
+
+    def __init__(self, csv_files, read_header):
+
+        self.csv_files = list(csv_files)
+        self.headers = [read_header(csv_file) for csv_file in self.csv_files]
+        self.header = self.headers[0]
+        self.schemas = [SurveySchema.from_header(header) for header in self.headers]
+        self.schema = self.schemas[0]
+        self.labels = self.wave_labels(self.csv_files)
+        self.column_maps = [self.column_map(schema) for schema in self.schemas]
+
+    def __len__(self):
+
+        return len(self.csv_files)
+
+    def __iter__(self):
+
+        return iter(zip(self.labels, self.csv_files, self.column_maps))
+
+    def wave_labels(self, csv_files):
+
+        labels = []
+        for csv_file in csv_files:
+            label = os.path.splitext(os.path.basename(csv_file))[0]
+            if label in labels or label == POOLED_WAVE:
+                label = f"{label} ({len(labels) + 1})"
+            labels.append(label)
+        return labels
+
+    def column_map(self, schema):
+        """First-wave column position -> this wave's column position, for every question both waves asked"""
+        column_map = {}
+        for position, key in enumerate(self.schema.keys):
+            wave_position = schema.position(key)
+            if wave_position is not None:
+                column_map[position] = wave_position
+        return column_map
+
+    def wave_columns(self, column_map, columns):
+        """This wave's columns to read for the given first-wave columns, keyed by wave position"""
+        return {column_map[col_index]: col_index for col_index in columns if col_index in column_map}
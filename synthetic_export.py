@@ -0,0 +1,250 @@
+import csv
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+COLUMN_COUNT = 199
+
+METADATA_COLUMNS = [
+    ('StartDate', 'Start Date', 'startDate'),
+    ('EndDate', 'End Date', 'endDate'),
+    ('Status', 'Response Type', 'status'),
+    ('IPAddress', 'IP Address', 'ipAddress'),
+    ('Progress', 'Progress', 'progress'),
+    ('Duration (in seconds)', 'Duration (in seconds)', 'duration'),
+    ('Finished', 'Finished', 'finished'),
+    ('RecordedDate', 'Recorded Date', 'recordedDate'),
+    ('ResponseId', 'Response ID', '_recordId'),
+    ('RecipientLastName', 'Recipient Last Name', 'recipientLastName'),
+    ('RecipientFirstName', 'Recipient First Name', 'recipientFirstName'),
+    ('RecipientEmail', 'Recipient Email', 'recipientEmail'),
+    ('ExternalReference', 'External Data Reference', 'externalDataReference'),
+    ('LocationLatitude', 'Location Latitude', 'locationLatitude'),
+    ('LocationLongitude', 'Location Longitude', 'locationLongitude'),
+    ('DistributionChannel', 'Distribution Channel', 'distributionChannel'),
+    ('UserLanguage', 'User Language', 'userLanguage')
+]
+
+SUBJECT_QUESTION = ("What was the subject area? (You may select more than one if multi-disciplinary).\n\n"
+                    "If none are appropriate please select 'Other' and specify the subject area.")
+DOCTORAL_SUBJECT_QUESTION = ("In what subject area are/did you study? (You may select more than one if multidisciplinary).\n"
+                             "If none are appropriate please select 'Other' and specify the subject area.")
+
+# Survey questions the loader reads, at the positions they have in the real export.
+QUESTION_COLUMNS = {
+    18: ('QA', 'What is your gender?'),
+    19: ('Q1', 'In what year were you born?'),
+    20: ('Q2', 'What is your nationality?'),
+    23: ('Q5', 'Do you consider yourself to have a disability?'),
+    24: ('Q6', 'Do you have children?'),
+    25: ('Q6B', 'If so, how many children do you have?'),
+    27: ('Q7', 'What is your marital status?'),
+    36: ('Q13', f"{SUBJECT_QUESTION} - Selected Choice"),
+    37: ('Q13_53_TEXT', f"{SUBJECT_QUESTION} - Other (Specify Below) - Text"),
+    42: ('Q15C', f"{SUBJECT_QUESTION} - Selected Choice"),
+    43: ('Q15C_53_TEXT', f"{SUBJECT_QUESTION} - Other (Specify Below) - Text"),
+    51: ('Q18', f"{DOCTORAL_SUBJECT_QUESTION} - Selected Choice"),
+    52: ('Q18_53_TEXT', f"{DOCTORAL_SUBJECT_QUESTION} - Other (Specify Below) - Text"),
+    60: ('Q22', 'In what year did you begin your doctorate?'),
+    84: ('Q36', 'What best describes your main employment or role? - Selected Choice'),
+    88: ('Q38', 'How many fixed term contracts have you had since completing your doctorate?'),
+    113: ('Q57', 'What do you consider to be the biggest barrier to achieving your chosen career (if applicable)?'),
+    114: ('Q58', 'How confident are you that you will achieve your career goals in research?')
+}
+
+# Answer distributions modelled on a real PATHWAYS export; None is a blank answer.
+GENDERS = {'Female': 0.70, 'Male': 0.13, '3': 0.01, '4': 0.01, None: 0.15}
+NATIONALITIES = {'Irish': 0.45, 'Irish ': 0.10, 'irish': 0.05, 'British': 0.04, 'German': 0.04, 'Spanish': 0.03,
+                 'Indian': 0.02, 'Italian': 0.02, 'Polish': 0.02, 'American': 0.01, 'Canadian': 0.01,
+                 'Romanian': 0.01, 'Greek': 0.01, 'Portuguese': 0.01, 'English': 0.10, None: 0.08}
+DISABILITY = {'No': 0.76, 'Yes': 0.11, 'Unsure': 0.07, None: 0.06}
+HAS_CHILDREN = {'No': 0.56, 'Yes': 0.38, None: 0.06}
+CHILDREN_COUNTS = {'1': 0.21, '2': 0.52, '3': 0.24, '4': 0.015, '5': 0.015}
+MARITAL_STATUS = {'Married': 0.41, 'In a relationship': 0.28, 'Single (Never Married)': 0.19, 'Divorced': 0.04,
+                  'Separated': 0.01, 'Widowed': 0.003, None: 0.067}
+EMPLOYMENT = {'Full-time': 0.51,
+              'Part-time (If selected, please state your percentage of a full-time post below)': 0.05,
+              'Other (Specify Below)': 0.03, 'Hourly-paid (Ad hoc hours, i.e. zero hours contract)': 0.02,
+              'Hourly-paid (Fixed Hours)': 0.005, 'Unpaid': 0.005, None: 0.38}
+CONFIDENCE = {'Somewhat confident': 0.18, 'Neutral': 0.12, 'Somewhat doubtful': 0.11, 'Very confident': 0.07,
+              'Very doubtful': 0.06, None: 0.46}
+
+SUBJECTS = ['Biology and Life Sciences', 'Psychology', 'Biomedical Science', 'Sociology', 'Education',
+            'Computer Science and Information Technology', 'Engineering', 'English Literature and Language',
+            'Business and Management Studies', 'History', 'Health Sciences and Public Health', 'Art and Design',
+            'Medicine', 'Nursing', 'Earth and Environmental Sciences', 'Mathematics and Statistics', 'Biochemistry',
+            'Philosophy', 'Zoology', 'Chemistry', 'Law and Legal Studies', 'Data Science and Analytics',
+            'Anthropology', 'Economics', 'Nursing and Midwifery', 'Architecture', 'Social Work and Social Policy',
+            'Sports Science', 'Veterinary Science', 'Communications and Media Studies', 'Political Science',
+            'Archaeology', 'Geography', 'Linguistics', 'Fine Arts', 'Physiotherapy', 'International Relations',
+            'Criminology', 'Physics', 'Creative Writing']
+OTHER_SUBJECT = 'Other (Specify Below)'
+OTHER_SUBJECT_TEXTS = ['Neuroscience', 'Agriculture', 'Social care', 'Psychiatry', 'Public Relations',
+                       'Interactive Multimedia', 'Modern Languages', 'Photography', 'Information studies',
+                       'German literature', 'Biology', 'computer science', 'Music']
+
+# Each level answers with a share of blanks, "Other" and the chance of a second and third subject.
+SUBJECT_LEVELS = {
+    36: {'blank': 0.10, 'other': 0.08, 'second': 0.15, 'third': 0.05},
+    42: {'blank': 0.31, 'other': 0.12, 'second': 0.12, 'third': 0.04},
+    51: {'blank': 0.33, 'other': 0.10, 'second': 0.12, 'third': 0.04}
+}
+
+BARRIER_PHRASES = ['Lack of funding', 'Competition for permanent positions', 'Work-life balance',
+                   'Childcare costs and lack of flexibility', 'Lack of opportunities', 'Gender bias in promotion',
+                   'No mentoring or support from senior staff', 'Heavy teaching workload and admin',
+                   'Fixed term contracts', 'Having to relocate for every post', 'Burnout and mental health',
+                   'Time', 'Being a single parent of two kids', 'Precarious employment',
+                   'Grant funding is too competitive', 'Lack of remote working options',
+                   'Discrimination as a woman in science', 'Caring responsibilities for family']
+BARRIER_BLANK = 0.63
+
+class SyntheticExport:
+    """Writes Qualtrics-shaped PATHWAYS exports filled with randomly generated answers"""
+
+    def __init__(self, rows, seed=0):
+
+        self.rows = rows
+        self.seed = seed
+
+    def header_rows(self):
+
+        codes = [f"X{position}" for position in range(COLUMN_COUNT)]
+        questions = [f"Survey question {position}" for position in range(COLUMN_COUNT)]
+        import_ids = [json.dumps({'ImportId': f"QID{position}"}, separators=(',', ':')) for position in range(COLUMN_COUNT)]
+
+
+        for position, (code, question, import_id) in enumerate(METADATA_COLUMNS):
+            codes[position] = code
+            questions[position] = question
+            import_ids[position] = json.dumps({'ImportId': import_id}, separators=(',', ':'))
+
+
+        for position, (code, question) in QUESTION_COLUMNS.items():
+            codes[position] = code
+            questions[position] = question
+
+
+        return [codes, questions, import_ids]
+
+    def write(self, path, chunk_rows=100000):
+
+        rng = np.random.default_rng(self.seed)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerows(self.header_rows())
+
+
+            # Qualtrics puts the survey preview response first; the loader skips it.
+            self.responses(rng, 1, 0, preview=True).to_csv(f, header=False, index=False)
+            for start in range(0, self.rows, chunk_rows):
+                chunk = self.responses(rng, min(chunk_rows, self.rows - start), start)
+                chunk.to_csv(f, header=False, index=False)
+        return path
+
+    def responses(self, rng, count, start, preview=False):
+
+        columns = {position: np.full(count, None, dtype=object) for position in range(COLUMN_COUNT)}
+
+
+        started = pd.Timestamp('2024-11-07') + pd.to_timedelta(start + np.arange(count), unit='s') * 7
+        duration = rng.integers(60, 3600, count)
+        progress = np.where(rng.random(count) < 0.31, 100, rng.integers(20, 100, count))
+        columns[0] = started.strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+        columns[1] = (started + pd.to_timedelta(duration, unit='s')).strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+        columns[2] = np.full(count, 'Survey Preview' if preview else 'IP Address', dtype=object)
+        columns[4] = progress.astype(str)
+        columns[5] = duration.astype(str)
+        columns[6] = np.where(progress == 100, 'True', 'False')
+        columns[7] = columns[1]
+        columns[8] = self.response_ids(rng, count)
+        columns[15] = np.full(count, 'preview' if preview else 'anonymous', dtype=object)
+        columns[16] = np.full(count, 'EN', dtype=object)
+
+
+        columns[18] = self.choose(rng, GENDERS, count)
+        birth_year = np.clip(np.rint(rng.normal(1985, 9, count)), 1945, 2001).astype(int)
+        columns[19] = self.blank(rng, birth_year.astype(str).astype(object), 0.07)
+        columns[20] = self.choose(rng, NATIONALITIES, count)
+        columns[23] = self.choose(rng, DISABILITY, count)
+        columns[24] = self.choose(rng, HAS_CHILDREN, count)
+        columns[25] = np.where(columns[24] == 'Yes', self.choose(rng, CHILDREN_COUNTS, count), None)
+        columns[27] = self.choose(rng, MARITAL_STATUS, count)
+
+
+        for position, shares in SUBJECT_LEVELS.items():
+            columns[position], columns[position + 1] = self.subjects(rng, count, shares)
+
+
+        doctoral_year = np.minimum(birth_year + rng.integers(23, 40, count), 2024)
+        columns[60] = self.blank(rng, doctoral_year.astype(str).astype(object), 0.34)
+        columns[84] = self.choose(rng, EMPLOYMENT, count)
+        fixed_terms = np.minimum(rng.geometric(0.35, count) - 1, 12)
+        columns[88] = np.where(pd.notna(columns[84]), self.blank(rng, fixed_terms.astype(str).astype(object), 0.25), None)
+        columns[113] = self.barriers(rng, count)
+        columns[114] = self.choose(rng, CONFIDENCE, count)
+
+
+        return pd.DataFrame(columns)
+
+    def choose(self, rng, distribution, count):
+
+        answers = np.array(list(distribution), dtype=object)
+        weights = np.array(list(distribution.values()), dtype=float)
+        return answers[rng.choice(len(answers), size=count, p=weights / weights.sum())]
+
+    def blank(self, rng, values, share):
+
+        return np.where(rng.random(len(values)) < share, None, values)
+
+    def response_ids(self, rng, count):
+
+        alphabet = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'))
+        letters = np.ascontiguousarray(alphabet[rng.integers(0, len(alphabet), (count, 15))])
+        return np.char.add('R_', letters.view('<U15').ravel()).astype(object)
+
+    def subjects(self, rng, count, shares):
+
+        subjects = np.array(SUBJECTS + [OTHER_SUBJECT], dtype=object)
+        weights = np.concatenate([1.0 / np.arange(1, len(SUBJECTS) + 1), [0.0]])
+        weights = weights / weights.sum() * (1 - shares['other'])
+        weights[-1] = shares['other']
+
+
+        picks = [subjects[rng.choice(len(subjects), size=count, p=weights)] for _ in range(3)]
+        answer = pd.Series(picks[0], dtype=object)
+        for pick, share in ((picks[1], shares['second']), (picks[2], shares['third'])):
+            answer = answer.where(rng.random(count) >= share, answer + ',' + pd.Series(pick, dtype=object))
+
+
+        answer = answer.where(rng.random(count) >= shares['blank'], None)
+        other_texts = np.array(OTHER_SUBJECT_TEXTS, dtype=object)[rng.integers(0, len(OTHER_SUBJECT_TEXTS), count)]
+        other = np.where(answer.str.contains(OTHER_SUBJECT, regex=False).fillna(False).to_numpy(dtype=bool), other_texts, None)
+        return answer.to_numpy(dtype=object), other
+
+    def barriers(self, rng, count):
+
+        phrases = np.array(BARRIER_PHRASES, dtype=object)
+        first = pd.Series(phrases[rng.integers(0, len(phrases), count)], dtype=object)
+        second = pd.Series(phrases[rng.integers(0, len(phrases), count)], dtype=object)
+        text = first.where(rng.random(count) >= 0.3, first + ' and ' + second.str.lower())
+        return text.where(rng.random(count) >= BARRIER_BLANK, None).to_numpy(dtype=object)
+
+
+def parse_args():
+
+    parser = argparse.ArgumentParser(description="Write a synthetic Qualtrics-shaped PATHWAYS export")
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--rows', type=int, default=1000, help="Number of survey responses to generate")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed, so the same export can be regenerated")
+    return parser.parse_args()
+
+def main():
+
+    args = parse_args()
+    SyntheticExport(args.rows, args.seed).write(args.output)
+    print(f"Wrote {args.rows} synthetic responses to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+import numpy as np
+import pandas as pd
+from respondent_store import RespondentStore
+from subject_index import SubjectIndex
+
+CONFIDENCE_ORDER = [
+    'Very Confident',
+    'Confident',
+    'Somewhat Confident',
+    'Not Very Confident',
+    'Not Confident'
+]
+
+class TopicAccumulator:
+    """Partial result of one topic that can grow or shrink by raw responses and combine with other partials.
+
+    add and remove take the same response input; merge and subtract take another accumulator of the topic.
+    Counting accumulators only implement _combine, which merge and subtract call with a sign of 1 or -1.
+    """
+
+    def empty(self):
+
+        raise NotImplementedError
+
+    def add(self, *responses):
+
+        raise NotImplementedError
+
+    def remove(self, *responses):
+
+        removed = self.empty()
+        removed.add(*responses)
+        return self.subtract(removed)
+
+    def merge(self, other):
+
+        return self._combine(other, 1)
+
+    def subtract(self, other):
+
+        return self._combine(other, -1)
+
+    def _combine(self, other, sign):
+
+        raise NotImplementedError
+
+    def finalize(self):
+
+        raise NotImplementedError
+
+
+def _combine_counts(target, source, sign):
+
+    for key, count in source.items():
+        target[key] = target.get(key, 0) + sign * count
+        if target[key] == 0:
+            del target[key]
+
+
+class DemographicAccumulator(TopicAccumulator):
+    """Respondent store parts in file order, with the ResponseId of every respondent"""
+
+    def __init__(self):
+
+        self.parts = []
+        self.response_ids = []
+
+    def empty(self):
+
+        return DemographicAccumulator()
+
+    def add(self, store, response_ids=None):
+
+        self.parts.append(store)
+        if response_ids is None:
+            response_ids = np.full(len(store), None, dtype=object)
+        self.response_ids.append(np.asarray(response_ids, dtype=object))
+
+    def merge(self, other):
+
+        self.parts.extend(other.parts)
+        self.response_ids.extend(other.response_ids)
+        return self
+
+    def subtract(self, other):
+
+        removed = pd.Index(np.concatenate(other.response_ids) if other.response_ids else [])
+        for i, (store, response_ids) in enumerate(zip(self.parts, self.response_ids)):
+            keep = ~pd.Index(response_ids).isin(removed)
+            self.parts[i] = store.take(np.flatnonzero(keep))
+            self.response_ids[i] = response_ids[keep]
+        return self
+
+    def reorder(self, response_ids, ids):
+        """Sort respondents into the order of response_ids and renumber them with the matching ids"""
+        store = RespondentStore.concat(self.parts)
+        positions = pd.Index(response_ids).get_indexer(np.concatenate(self.response_ids))
+        order = np.argsort(positions, kind='stable')
+        ids = np.asarray(ids)[positions[order]]
+        self.parts = [store.take(order, ids)]
+        self.response_ids = [np.concatenate(self.response_ids)[order]]
+        return self
+
+    def finalize(self):
+
+        store = RespondentStore.concat(self.parts)
+        store.rollups()
+        return store
+
+
+class SubjectAccumulator(TopicAccumulator):
+    """Subject token counts per degree level, with 'Other' free text kept raw until finalize.
+
+    'Other' answers are standardized against subjects when given, otherwise against the subjects counted.
+    """
+
+    def __init__(self, levels, subjects=None):
+
+        self.levels = list(levels)
+        self.subjects = subjects
+        self.subject_counts = {level: {} for level in self.levels}
+        self.other_counts = {level: {} for level in self.levels}
+
+    def empty(self):
+
+        return SubjectAccumulator(self.levels, self.subjects)
+
+    def add(self, tokens, other_subject):
+
+        is_other = tokens['subject'] == other_subject
+        subjects = tokens[~is_other]
+        others = tokens[is_other & (tokens['other_text'] != '')]
+
+        for (level, subject), count in subjects.groupby(['level', 'subject'], observed=True).size().items():
+            counts = self.subject_counts[level]
+            counts[subject] = counts.get(subject, 0) + int(count)
+
+        for (level, text), count in others.groupby(['level', 'other_text'], observed=True).size().items():
+            counts = self.other_counts[level]
+            counts[text] = counts.get(text, 0) + int(count)
+
+    def add_counts(self, token_counts, other_subject):
+        """Add ((level, subject, other_text), count) pairs counted elsewhere"""
+        for (level, subject, text), count in token_counts:
+            if subject != other_subject:
+                counts, key = self.subject_counts[level], subject
+            elif text != '':
+                counts, key = self.other_counts[level], text
+            else:
+                continue
+            counts[key] = counts.get(key, 0) + int(count)
+
+    def _combine(self, other, sign):
+
+        for level in self.levels:
+            _combine_counts(self.subject_counts[level], other.subject_counts[level], sign)
+            _combine_counts(self.other_counts[level], other.other_counts[level], sign)
+        return self
+
+    def finalize(self, index_factory=SubjectIndex):
+
+        all_subjects = self.subjects
+        if all_subjects is None:
+            all_subjects = sorted(set(subject for level in self.levels for subject in self.subject_counts[level]))
+        subject_index = index_factory(all_subjects)
+
+
+        education_data = {}
+        for level in self.levels:
+            counts = dict(self.subject_counts[level])
+            for text, count in self.other_counts[level].items():
+                subject = subject_index.standardize(text)
+                counts[subject] = counts.get(subject, 0) + count
+
+            education_data[level] = [
+                {'name': subject, 'value': count}
+                for subject, count in sorted(counts.items())
+                if count > 0
+            ]
+
+        return all_subjects, education_data
+
+
+class GenderEmploymentAccumulator(TopicAccumulator):
+    """Full-time and fixed-term counts by gender"""
+
+    def __init__(self, has_employment=True, has_fixed_term=True):
+
+        self.has_employment = has_employment
+        self.has_fixed_term = has_fixed_term
+        self.counts = {
+            'female_total': 0,
+            'male_total': 0,
+            'female_fulltime': 0,
+            'male_fulltime': 0,
+            'female_with_fixed_term': 0,
+            'male_with_fixed_term': 0
+        }
+
+    def empty(self):
+
+        return GenderEmploymentAccumulator(self.has_employment, self.has_fixed_term)
+
+    def add(self, respondents):
+
+        female = respondents['gender'] == 'Female'
+        male = respondents['gender'] == 'Male'
+
+        if self.has_employment:
+            self.counts['female_total'] += int(female.sum())
+            self.counts['male_total'] += int(male.sum())
+            self.counts['female_fulltime'] += int((female & respondents['fulltime']).sum())
+            self.counts['male_fulltime'] += int((male & respondents['fulltime']).sum())
+
+        if self.has_fixed_term:
+            self.counts['female_with_fixed_term'] += int((female & respondents['has_fixed_term']).sum())
+            self.counts['male_with_fixed_term'] += int((male & respondents['has_fixed_term']).sum())
+
+    def _combine(self, other, sign):
+
+        for key, count in other.counts.items():
+            self.counts[key] += sign * count
+        return self
+
+    def finalize(self):
+
+        counts = self.counts
+        female_total = counts['female_total']
+        male_total = counts['male_total']
+
+
+        male_percentage = (counts['male_fulltime'] / male_total * 100) if male_total > 0 else 0
+        female_percentage = (counts['female_fulltime'] / female_total * 100) if female_total > 0 else 0
+        female_fixed_term_percentage = (counts['female_with_fixed_term'] / female_total * 100) if female_total > 0 else 0
+        male_fixed_term_percentage = (counts['male_with_fixed_term'] / male_total * 100) if male_total > 0 else 0
+
+
+        gender_employment_data = {}
+        gender_employment_data['fulltime_by_gender'] = [
+            {'name': 'Female', 'value': round(female_percentage, 1)},
+            {'name': 'Male', 'value': round(male_percentage, 1)}
+        ]
+
+        gender_employment_data['fulltime_counts'] = {
+            'female_total': female_total,
+            'male_total': male_total,
+            'female_fulltime': counts['female_fulltime'],
+            'male_fulltime': counts['male_fulltime']
+        }
+
+        gender_employment_data['fixed_term_by_gender'] = [
+            {'name': 'Female', 'value': round(female_fixed_term_percentage, 1)},
+            {'name': 'Male', 'value': round(male_fixed_term_percentage, 1)}
+        ]
+
+        gender_employment_data['fixed_term_counts'] = {
+            'female_with_fixed_term': counts['female_with_fixed_term'],
+            'male_with_fixed_term': counts['male_with_fixed_term']
+        }
+
+        return gender_employment_data
+
+
+class BarrierAccumulator(TopicAccumulator):
+    """Career barrier category counts for female respondents"""
+
+    def __init__(self, classifier):
+
+        self.classifier = classifier
+        self.barrier_counts = {category: 0 for category in classifier.categories}
+        self.unmatched = 0
+        self.total_valid_responses = 0
+
+    def empty(self):
+
+        return BarrierAccumulator(self.classifier)
+
+    def add(self, barrier_texts):
+
+        self.add_indicators(self.classifier.classify(barrier_texts))
+
+    def add_indicators(self, indicators):
+
+        for category, count in indicators.sum().items():
+            self.barrier_counts[category] += int(count)
+
+        self.unmatched += int((~indicators.any(axis=1)).sum())
+        self.total_valid_responses += len(indicators)
+
+    def _combine(self, other, sign):
+
+        for category, count in other.barrier_counts.items():
+            self.barrier_counts[category] += sign * count
+        self.unmatched += sign * other.unmatched
+        self.total_valid_responses += sign * other.total_valid_responses
+        return self
+
+    def finalize(self):
+
+        barrier_counts = dict(self.barrier_counts)
+        if self.unmatched > 0:
+            barrier_counts["Other"] = self.unmatched
+
+        total_valid_responses = self.total_valid_responses
+        if total_valid_responses > 0:
+            barrier_percentages = {
+                category: (count / total_valid_responses) * 100
+                for category, count in barrier_counts.items()
+            }
+        else:
+            barrier_percentages = barrier_counts
+
+
+        barriers_data = {}
+        barriers_data['career_barriers'] = [
+            {'name': name, 'value': round(percentage, 1)}
+            for name, percentage in sorted(barrier_percentages.items())
+        ]
+
+        barriers_data['raw_counts'] = barrier_counts
+        barriers_data['total_valid_responses'] = total_valid_responses
+
+        return barriers_data
+
+
+class ConfidenceAccumulator(TopicAccumulator):
+    """Confidence level counts by gender, in first-seen order"""
+
+    def __init__(self):
+
+        self.level_counts = {'Female': {}, 'Male': {}}
+
+    def empty(self):
+
+        return ConfidenceAccumulator()
+
+    def add(self, respondents):
+
+        answered = respondents[respondents['gender'].notna() & respondents['confidence'].notna()]
+        for (gender, level), count in answered.groupby(['gender', 'confidence'], sort=False, observed=True).size().items():
+            counts = self.level_counts[gender]
+            counts[level] = counts.get(level, 0) + int(count)
+
+    def _combine(self, other, sign):
+
+        for gender, counts in other.level_counts.items():
+            _combine_counts(self.level_counts[gender], counts, sign)
+        return self
+
+    def finalize(self):
+
+        gender_data = {}
+        for gender, counts in self.level_counts.items():
+            data = []
+            for level in CONFIDENCE_ORDER:
+                if level in counts and counts[level] > 0:
+                    data.append({'name': level, 'value': counts[level], 'gender': gender})
+
+            for level, count in counts.items():
+                if level not in CONFIDENCE_ORDER and count > 0:
+                    data.append({'name': level, 'value': count, 'gender': gender})
+            gender_data[gender] = data
+
+        return {'confidenceLevel': gender_data['Female'] + gender_data['Male']}
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import threading
+import functools
+import tracemalloc
+
+class Span:
+    """One timed stage; records duration and the peak traced allocation while it was open"""
+
+    def __init__(self, tracer, name, attributes):
+
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.parent = None
+        self.thread = None
+        self.start = 0.0
+        self.duration = 0.0
+        self.start_memory = 0
+        self.peak_memory = 0
+
+    def __enter__(self):
+
+        self.tracer._open(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        self.tracer._close(self)
+        return False
+
+    def set(self, **attributes):
+
+        self.attributes.update(attributes)
+
+
+class NullSpan:
+    """Stand-in returned while tracing is disabled, so instrumented code pays almost nothing"""
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+
+        return False
+
+    def set(self, **attributes):
+
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+class Tracer:
+    """Collects nestable spans around load and render stages and exports them as Chrome trace JSON"""
+
+    def __init__(self):
+
+        self.enabled = False
+        self.trace_memory = False
+        self.spans = []
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open_spans = set()
+
+    def enable(self, trace_memory=True):
+
+        self.spans = []
+        self._open_spans = set()
+        self.origin = time.perf_counter()
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def span(self, name, **attributes):
+
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attributes)
+
+    def traced(self, name):
+        """Decorator that wraps each call of a function in a span"""
+        def decorate(function):
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with Span(self, name, {}):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _stack(self):
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _update_peaks(self):
+
+        # tracemalloc keeps a single process-wide peak, so fold it into the open spans of every thread
+        # before resetting it. Callers hold the lock.
+        current, peak = tracemalloc.get_traced_memory()
+        for span in self._open_spans:
+            span.peak_memory = max(span.peak_memory, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _open(self, span):
+
+        stack = self._stack()
+        span.parent = stack[-1] if stack else None
+        span.thread = threading.get_ident()
+        with self._lock:
+            if self.trace_memory and tracemalloc.is_tracing():
+                span.start_memory = span.peak_memory = self._update_peaks()
+            self._open_spans.add(span)
+        stack.append(span)
+        span.start = time.perf_counter()
+
+    def _close(self, span):
+
+        span.duration = time.perf_counter() - span.start
+        stack = self._stack()
+        with self._lock:
+            if self.trace_memory and tracemalloc.is_tracing():
+                self._update_peaks()
+            self._open_spans.discard(span)
+            self.spans.append(span)
+        if stack and stack[-1] is span:
+            stack.pop()
+
+    def records(self):
+
+        records = []
+        for span in sorted(self.spans, key=lambda span: span.start):
+            record = {
+                'name': span.name,
+                'start_ms': (span.start - self.origin) * 1000,
+                'duration_ms': span.duration * 1000,
+                'parent': span.parent.name if span.parent is not None else None,
+                'attributes': span.attributes
+            }
+            if self.trace_memory:
+                record['peak_alloc_bytes'] = span.peak_memory - span.start_memory
+            records.append(record)
+        return records
+
+    def export_json(self, path):
+        """Write the spans in Chrome trace-event format, viewable in chrome://tracing or Perfetto"""
+        events = []
+        for span in self.spans:
+            args = dict(span.attributes)
+            if self.trace_memory:
+                args['peak_alloc_bytes'] = span.peak_memory - span.start_memory
+            events.append({'name': span.name, 'ph': 'X', 'pid': os.getpid(), 'tid': span.thread,
+                           'ts': (span.start - self.origin) * 1e6, 'dur': span.duration * 1e6, 'args': args})
+
+
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'spans': self.records()}, f, indent=1, default=str)
+        return path
+
+
+tracer = Tracer()
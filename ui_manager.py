@@ -1,5 +1,20 @@
 import tkinter as tk
 from tkinter import ttk
+from chart_catalog import TOPIC_NAMES, TOPIC_DATA_TYPES, CHART_TYPES, TOPIC_CHART_TYPES
+from survey_waves import POOLED_WAVE
+
+FILTER_LABELS = {
+    'gender': 'Gender',
+    'maritalStatus': 'Marital Status',
+    'disabilityStatus': 'Disability',
+    'nationality': 'Nationality',
+    'birthYear': 'Birth Year',
+    'doctoralYear': 'Doctoral Start Year'
+}
+
+RANGE_FILTERS = ('birthYear', 'doctoralYear')
+
+ALL_VALUES = "All"
 
 class UIManager:
 
@@ -20,8 +35,7 @@ class UIManager:
         ttk.Label(self.control_frame, text="Topic").grid(column=0, row=0, sticky=tk.W, padx=5, pady=5)
         self.topic_type = tk.StringVar(value="")
         self.topic_combo = ttk.Combobox(self.control_frame, textvariable=self.topic_type)
-        self.topic_combo['values'] = ('Demographic', 'Education', 'Gender and Employment', 'Barriers to Career Goals', 
-                                    'Confidence in Achieving Career Goals')
+        self.topic_combo['values'] = TOPIC_NAMES
         self.topic_combo.grid(column=1, row=0, padx=5, pady=5)
         self.topic_combo.bind('<<ComboboxSelected>>', self.controller.update_topic_selection)
         
@@ -29,11 +43,24 @@ class UIManager:
         ttk.Label(self.control_frame, text="Chart Type").grid(column=2, row=0, sticky=tk.W, padx=5, pady=5)
         self.chart_type = tk.StringVar(value="bar")
         self.chart_combo = ttk.Combobox(self.control_frame, textvariable=self.chart_type)
-        self.chart_combo['values'] = ('bar', 'line', 'pie')
+        self.chart_combo['values'] = CHART_TYPES
         self.chart_combo.grid(column=3, row=0, padx=5, pady=5)
         self.chart_combo.bind('<<ComboboxSelected>>', self.controller.update_chart)
         
 
+        # Only shown when several waves of the survey are loaded.
+        self.wave_label = ttk.Label(self.control_frame, text="Wave")
+        self.wave = tk.StringVar(value=POOLED_WAVE)
+        self.wave_combo = ttk.Combobox(self.control_frame, textvariable=self.wave, state='readonly')
+        self.wave_combo.bind('<<ComboboxSelected>>', self.controller.update_wave_selection)
+        
+
+        # Packed above the chart once the loader has indexed the respondents.
+        self.filter_frame = ttk.LabelFrame(self.root, text="Filters", padding="5")
+        self.filter_vars = {}
+        self.filter_values = {}
+        
+
         self.chart_frame = ttk.Frame(self.root, padding="10")
         self.chart_frame.pack(fill=tk.BOTH, expand=True)
         
@@ -50,9 +77,89 @@ class UIManager:
         self.data_summary.pack(pady=5)
         
 
+        self.progress_bar = ttk.Progressbar(info_frame, mode='determinate', maximum=1.0, length=300)
+        
+
         self.color_frame = ttk.Frame(info_frame)
         self.color_frame.pack(pady=5)
 
+    def show_progress(self, text, fraction):
+
+        self.data_summary.config(text=text)
+        self.progress_bar['value'] = fraction
+        if not self.progress_bar.winfo_manager():
+            self.progress_bar.pack(pady=5, after=self.data_summary)
+
+    def hide_progress(self):
+
+        self.progress_bar.pack_forget()
+
+    def show_waves(self, waves):
+
+        self.wave_combo['values'] = waves
+        if self.wave.get() not in waves:
+            self.wave.set(POOLED_WAVE)
+        self.wave_label.grid(column=4, row=0, sticky=tk.W, padx=5, pady=5)
+        self.wave_combo.grid(column=5, row=0, padx=5, pady=5)
+
+    def show_filters(self, dimensions):
+        """Build the filter bar for {dimension: values}, keeping selections that are still available"""
+        for widget in self.filter_frame.winfo_children():
+            widget.destroy()
+            
+
+        self.filter_values = dimensions
+        columns = {0: 0, 1: 0}
+        for name, label in FILTER_LABELS.items():
+            if name not in dimensions:
+                continue
+                
+
+            # Categories share the first row; year ranges get a from and a to box on the second.
+            row = 1 if name in RANGE_FILTERS else 0
+            ttk.Label(self.filter_frame, text=label).grid(column=columns[row], row=row, sticky=tk.W, padx=5, pady=2)
+            columns[row] += 1
+            values = [str(value) for value in dimensions[name]]
+            for key in ([f"{name}_from", f"{name}_to"] if name in RANGE_FILTERS else [name]):
+                previous = self.filter_vars[key].get() if key in self.filter_vars else ALL_VALUES
+                self.filter_vars[key] = tk.StringVar(value=previous if previous in values else ALL_VALUES)
+                combo = ttk.Combobox(self.filter_frame, textvariable=self.filter_vars[key], state='readonly', width=14)
+                combo['values'] = [ALL_VALUES] + values
+                combo.grid(column=columns[row], row=row, padx=5, pady=2)
+                combo.bind('<<ComboboxSelected>>', self.controller.update_filters)
+                columns[row] += 1
+                
+
+        ttk.Button(self.filter_frame, text="Clear Filters", command=self.clear_filters).grid(
+            column=columns[1], row=1, padx=5, pady=2)
+        if not self.filter_frame.winfo_manager():
+            self.filter_frame.pack(fill=tk.X, padx=10, before=self.chart_frame)
+
+    def get_filters(self):
+        """{dimension: values to keep} from the filter bar, with None for dimensions left on All"""
+        filters = {}
+        for name, values in self.filter_values.items():
+            labels = {str(value): value for value in values}
+            if name in RANGE_FILTERS:
+                first = labels.get(self.filter_vars[f"{name}_from"].get())
+                last = labels.get(self.filter_vars[f"{name}_to"].get())
+                if first is None and last is None:
+                    filters[name] = None
+                else:
+                    first = min(values) if first is None else first
+                    last = max(values) if last is None else last
+                    filters[name] = range(int(first), int(last) + 1)
+            else:
+                selected = self.filter_vars[name].get()
+                filters[name] = {labels[selected]} if selected in labels else None
+        return filters
+
+    def clear_filters(self):
+
+        for variable in self.filter_vars.values():
+            variable.set(ALL_VALUES)
+        self.controller.update_filters()
+
     def update_topic_ui(self, topic):
 
 
@@ -66,40 +173,40 @@ class UIManager:
 
         if topic == "Demographic":
             ttk.Label(self.control_frame, text="Demographic Data").grid(column=0, row=1, sticky=tk.W, padx=5, pady=5)
-            self.data_type = tk.StringVar(value="children")
+            self.data_type = tk.StringVar(value=TOPIC_DATA_TYPES[topic][0])
             self.demographic_combo = ttk.Combobox(self.control_frame, textvariable=self.data_type)
-            self.demographic_combo['values'] = ('children', 'birthYear', 'maritalStatus', 'disability', 'doctoralYear')
+            self.demographic_combo['values'] = TOPIC_DATA_TYPES[topic]
             self.demographic_combo.grid(column=1, row=1, columnspan=3, sticky=tk.W, padx=5, pady=5)
             self.demographic_combo.bind('<<ComboboxSelected>>', self.controller.update_data_type)
             
         elif topic == "Education":
             ttk.Label(self.control_frame, text="Education Data").grid(column=0, row=1, sticky=tk.W, padx=5, pady=5)
-            self.data_type = tk.StringVar(value="undergraduate_subjects")
+            self.data_type = tk.StringVar(value=TOPIC_DATA_TYPES[topic][0])
             self.education_combo = ttk.Combobox(self.control_frame, textvariable=self.data_type)
-            self.education_combo['values'] = ('undergraduate_subjects', 'masters', 'doctoral')
+            self.education_combo['values'] = TOPIC_DATA_TYPES[topic]
             self.education_combo.grid(column=1, row=1, columnspan=3, sticky=tk.W, padx=5, pady=5)
             self.education_combo.bind('<<ComboboxSelected>>', self.controller.update_education_data)
             
         elif topic == "Gender and Employment":
             ttk.Label(self.control_frame, text="Gender and Employment Data").grid(column=0, row=1, sticky=tk.W, padx=5, pady=5)
-            self.data_type = tk.StringVar(value="fulltime_by_gender")
+            self.data_type = tk.StringVar(value=TOPIC_DATA_TYPES[topic][0])
             self.gender_employment_combo = ttk.Combobox(self.control_frame, textvariable=self.data_type)
-            self.gender_employment_combo['values'] = ('fulltime_by_gender', 'fixed_term_by_gender')
+            self.gender_employment_combo['values'] = TOPIC_DATA_TYPES[topic]
             self.gender_employment_combo.grid(column=1, row=1, columnspan=3, sticky=tk.W, padx=5, pady=5)
             self.gender_employment_combo.bind('<<ComboboxSelected>>', self.controller.update_gender_employment_data)
             
         elif topic == "Barriers to Career Goals":
 
-            self.data_type = tk.StringVar(value="career_barriers")
+            self.data_type = tk.StringVar(value=TOPIC_DATA_TYPES[topic][0])
             
 
-            self.chart_combo['values'] = ('bar',)  
+            self.chart_combo['values'] = TOPIC_CHART_TYPES[topic]
             if self.chart_type.get() != 'bar':
                 self.chart_type.set('bar')
             
         elif topic == "Confidence in Achieving Career Goals":
 
-            self.data_type = tk.StringVar(value="confidenceLevel")
+            self.data_type = tk.StringVar(value=TOPIC_DATA_TYPES[topic][0])
             
 
-            self.chart_combo['values'] = ('bar', 'line', 'pie')
\ No newline at end of file
+            self.chart_combo['values'] = CHART_TYPES
\ No newline at end of file